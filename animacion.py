@@ -0,0 +1,76 @@
+from recursos import assets
+
+
+class Animacion:
+    """
+    Secuencia de fotogramas que avanza con el tiempo (fps fotogramas por
+    segundo), no con los frames dibujados.
+
+    Las versiones volteadas en horizontal y las máscaras de colisión se
+    calculan una vez al crearla y salen de la caché de recursos, así que
+    todas las entidades que usan la misma animación comparten las mismas
+    superficies.
+    """
+    def __init__(self, frames, fps=10, bucle=True):
+        self.frames = list(frames)
+        self.fps = fps
+        self.bucle = bucle
+        self.volteados = [assets.volteada(frame) for frame in self.frames]
+        self.mascaras = [assets.mascara(frame) for frame in self.frames]
+        self.mascaras_volteadas = [assets.mascara(frame) for frame in self.volteados]
+
+    def __len__(self):
+        return len(self.frames)
+
+    def indice(self, tiempo):
+        """
+        Fotograma que toca tiempo segundos después de empezar.
+        """
+        n = int(tiempo * self.fps)
+        if self.bucle:
+            return n % len(self.frames)
+        return min(n, len(self.frames) - 1)
+
+    def imagen(self, tiempo, izquierda=False):
+        frames = self.volteados if izquierda else self.frames
+        return frames[self.indice(tiempo)]
+
+    def mascara(self, tiempo, izquierda=False):
+        mascaras = self.mascaras_volteadas if izquierda else self.mascaras
+        return mascaras[self.indice(tiempo)]
+
+
+class Animador:
+    """
+    Estado de animación de una entidad: qué animación está sonando, desde
+    cuándo y hacia qué lado mira. animaciones es un diccionario
+    estado -> Animacion que pueden compartir muchas entidades. Las imágenes
+    originales miran a la derecha.
+    """
+    __slots__ = ('animaciones', 'estado', 'tiempo', 'izquierda')
+
+    def __init__(self, animaciones, estado):
+        self.animaciones = animaciones
+        self.estado = estado
+        self.tiempo = 0.0
+        self.izquierda = False
+
+    def cambiar(self, estado):
+        """
+        Pasa a otra animación, que empieza desde el principio. Si ya estaba
+        en ella sigue por donde iba.
+        """
+        if estado != self.estado:
+            self.estado = estado
+            self.tiempo = 0.0
+
+    def update(self, dt):
+        self.tiempo += dt
+
+    @property
+    def image(self):
+        return self.animaciones[self.estado].imagen(self.tiempo, self.izquierda)
+
+    @property
+    def mask(self):
+        return self.animaciones[self.estado].mascara(self.tiempo, self.izquierda)
@@ -0,0 +1,67 @@
+import threading
+import time
+
+
+class Cronometro:
+    """
+    Apunta cuánto ha tardado cada etapa del arranque desde que se creó.
+    """
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.marcas = []
+
+    def marcar(self, etapa):
+        self.marcas.append((etapa, time.perf_counter() - self.inicio))
+
+    def tiempos(self):
+        """
+        Milisegundos desde el inicio hasta el final de cada etapa.
+        """
+        return {etapa: round(t * 1000, 2) for etapa, t in self.marcas}
+
+    def informe(self):
+        lineas = ["Arranque:"]
+        anterior = 0.0
+        for etapa, t in self.marcas:
+            lineas.append(f"    {etapa:<22}{t * 1000:8.1f} ms  (+{(t - anterior) * 1000:.1f})")
+            anterior = t
+        return "\n".join(lineas)
+
+
+class Carga:
+    """
+    Ejecuta una lista de tareas (etiqueta, función) en un hilo aparte para que
+    el hilo principal pueda seguir mostrando la pantalla de carga.
+
+    Los resultados quedan en resultados[etiqueta]. Si una tarea falla se
+    detiene la carga y el error queda en error como (etiqueta, excepción),
+    para tratarlo en el hilo principal.
+    """
+    def __init__(self, tareas):
+        self.tareas = list(tareas)
+        self.resultados = {}
+        self.hechas = 0
+        self.error = None
+        self._hilo = threading.Thread(target=self._cargar, name='carga', daemon=True)
+
+    def _cargar(self):
+        for etiqueta, funcion in self.tareas:
+            try:
+                self.resultados[etiqueta] = funcion()
+            except Exception as e:
+                self.error = (etiqueta, e)
+                return
+            self.hechas += 1
+
+    def empezar(self):
+        self._hilo.start()
+
+    @property
+    def progreso(self):
+        return self.hechas / len(self.tareas) if self.tareas else 1.0
+
+    def terminada(self):
+        return not self._hilo.is_alive()
+
+    def esperar(self, segundos=None):
+        self._hilo.join(segundos)
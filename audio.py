@@ -0,0 +1,129 @@
+import array
+import math
+
+import pygame
+
+# Configuración del mezclador: buffer pequeño para que los efectos suenen
+# sin retraso apreciable (512 muestras a 44,1 kHz son unos 12 ms)
+FRECUENCIA = 44100
+TAMANO_BUFFER = 512
+CANALES_SFX = 8
+MIN_VOLUME = 0.0
+MAX_VOLUME = 1.0
+VOLUME_STEP = 0.05
+# Cuánto cambia el volumen por segundo al subirlo, bajarlo o silenciarlo
+VELOCIDAD_FUNDIDO = 4.0
+
+
+def preinit():
+    """
+    Configura el mezclador para baja latencia. Hay que llamarla antes de
+    pygame.init().
+    """
+    pygame.mixer.pre_init(FRECUENCIA, -16, 2, TAMANO_BUFFER)
+
+
+def generar_barrido(desde, hasta, duracion, volumen=0.4):
+    """
+    Efecto sintetizado: un tono que va de la frecuencia desde a hasta y se
+    apaga. Devuelve un pygame.mixer.Sound en el formato del mezclador.
+    """
+    frecuencia, _, canales = pygame.mixer.get_init()
+    n = int(frecuencia * duracion)
+    muestras = array.array('h')
+    fase = 0.0
+    for i in range(n):
+        t = i / n
+        fase += 2 * math.pi * (desde + (hasta - desde) * t) / frecuencia
+        valor = int(32767 * volumen * (1 - t) * math.sin(fase))
+        muestras.extend([valor] * canales)
+    return pygame.mixer.Sound(buffer=muestras.tobytes())
+
+
+class AudioEngine:
+    """
+    Música de fondo y efectos de sonido.
+
+    La música se reproduce con pygame.mixer.music, que la va leyendo del
+    disco a trozos en lugar de cargarla entera. Los efectos se cargan una vez
+    en memoria como pygame.mixer.Sound y suenan en un número fijo de canales:
+    si están todos ocupados, el nuevo efecto le quita el canal al de menor
+    prioridad (si no es mayor que la suya). Los cambios de volumen no se
+    aplican de golpe: update() los va acercando al volumen pedido.
+    """
+    def __init__(self, music_path, volumen=0.5, canales=CANALES_SFX):
+        pygame.mixer.set_num_channels(canales)
+        self.canales = [pygame.mixer.Channel(i) for i in range(canales)]
+        self.prioridades = [0] * canales
+        self.sfx = {}
+
+        # Lanza pygame.error si no se puede cargar la música
+        pygame.mixer.music.load(music_path)
+        pygame.mixer.music.set_volume(volumen)
+        pygame.mixer.music.play(-1)
+        self.volumen = volumen
+        self.objetivo = volumen
+
+    def cargar_sfx(self, nombre, sonido):
+        """
+        Guarda un efecto ya decodificado. sonido puede ser una ruta o un
+        pygame.mixer.Sound.
+        """
+        if not isinstance(sonido, pygame.mixer.Sound):
+            sonido = pygame.mixer.Sound(sonido)
+        self.sfx[nombre] = sonido
+
+    def play(self, nombre, prioridad=0):
+        """
+        Reproduce un efecto. Devuelve el canal usado o None si no había
+        ninguno disponible para esa prioridad.
+        """
+        sonido = self.sfx[nombre]
+        elegido = None
+        for i, canal in enumerate(self.canales):
+            if not canal.get_busy():
+                elegido = i
+                break
+        if elegido is None:
+            # Robar el canal del efecto menos importante
+            elegido = min(range(len(self.canales)), key=self.prioridades.__getitem__)
+            if self.prioridades[elegido] > prioridad:
+                return None
+        canal = self.canales[elegido]
+        canal.play(sonido)
+        canal.set_volume(self.objetivo)
+        self.prioridades[elegido] = prioridad
+        return canal
+
+    def get_volume(self):
+        """
+        Volumen pedido (al que se está llegando con el fundido).
+        """
+        return self.objetivo
+
+    def increase_volume(self):
+        self.objetivo = min(self.objetivo + VOLUME_STEP, MAX_VOLUME)
+
+    def decrease_volume(self):
+        self.objetivo = max(self.objetivo - VOLUME_STEP, MIN_VOLUME)
+
+    def mute_sound(self):
+        self.objetivo = MIN_VOLUME
+
+    def unmute_sound(self):
+        self.objetivo = MAX_VOLUME
+
+    def update(self, dt):
+        """
+        Acerca el volumen de la música al pedido. Se llama una vez por frame.
+        """
+        if self.volumen == self.objetivo:
+            return
+        paso = VELOCIDAD_FUNDIDO * dt
+        if abs(self.objetivo - self.volumen) <= paso:
+            self.volumen = self.objetivo
+        elif self.objetivo > self.volumen:
+            self.volumen += paso
+        else:
+            self.volumen -= paso
+        pygame.mixer.music.set_volume(self.volumen)
@@ -0,0 +1,451 @@
+"""
+Banco de pruebas del bucle de juego sin ventana.
+
+Ejecuta juego.py o prueba.py con los drivers "dummy" de SDL (sin ventana ni
+audio), sin limitar los FPS con clock.tick y con el teclado simulado por un
+guion, y mide cada fase del frame:
+
+    python benchmark.py juego --frames 5000
+    python benchmark.py todos --json resultados.json --min-fps 300
+    python benchmark.py prueba --repeticion partida.rep
+
+Con --min-fps termina con código 1 si algún juego no llega a esos FPS, para
+detectar regresiones de rendimiento en CI. Con --lobos también termina con
+código 1 si algún lobo acaba un frame dentro de un hoyo. Con --repeticion, prueba.py juega
+una partida grabada (repeticion.py) en lugar del guion.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+FASES = ('eventos', 'actualizar', 'colisiones', 'dibujar', 'presentar')
+
+
+def configurar_headless():
+    """
+    Usa los drivers "dummy" de SDL. Hay que llamarla antes de pygame.init().
+    """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+
+class Teclas:
+    """
+    Estado de teclado sintético; se usa igual que pygame.key.get_pressed().
+    """
+    def __init__(self, pulsadas=()):
+        self.pulsadas = frozenset(pulsadas)
+
+    def __getitem__(self, tecla):
+        return tecla in self.pulsadas
+
+
+class TeclasScript:
+    """
+    Guion de entrada: lista de (frames, teclas pulsadas) que se repite en bucle.
+    """
+    def __init__(self, guion):
+        self.estados = []
+        for frames, pulsadas in guion:
+            self.estados.extend([Teclas(pulsadas)] * frames)
+
+    def __call__(self, frame):
+        return self.estados[frame % len(self.estados)]
+
+
+def guion_demo():
+    from pygame.locals import K_a, K_d, K_s, K_w, K_SPACE
+    return [
+        (20, {K_d}),
+        (5, {K_d, K_SPACE}),
+        (20, {K_a}),
+        (10, {K_w}),
+        (10, {K_s}),
+        (15, ()),
+    ]
+
+
+class Medidor:
+    """
+    Acumula el tiempo de cada fase y el de cada frame.
+    """
+    def __init__(self):
+        self.tiempos = dict.fromkeys(FASES, 0.0)
+        self.frames = []
+
+    def resultado(self, nombre, bloques, colecciones, pico_memoria):
+        total = sum(self.frames)
+        ordenados = sorted(self.frames)
+        n = len(ordenados)
+        return {
+            'juego': nombre,
+            'frames': n,
+            'fps': n / total if total else 0.0,
+            'frame_ms_p50': ordenados[n // 2] * 1000,
+            'frame_ms_p99': ordenados[min(n - 1, int(n * 0.99))] * 1000,
+            'frame_ms_max': ordenados[-1] * 1000,
+            'fases_ms': {fase: t * 1000 / n for fase, t in self.tiempos.items()},
+            'bloques_asignados': bloques,
+            'colecciones_gc': colecciones,
+            'pico_memoria_kb': pico_memoria,
+        }
+
+
+def _medir(nombre, crear, frame, frames, memoria, extra=None):
+    """
+    Ejecuta frames veces frame(objeto, i, tiempos) y devuelve las medidas.
+    extra(objeto) puede añadir datos propios de cada juego al resultado.
+    """
+    random.seed(0)
+    objeto = crear()
+    medidor = Medidor()
+
+    gc.collect()
+    colecciones = sum(g['collections'] for g in gc.get_stats())
+    bloques = sys.getallocatedblocks()
+    if memoria:
+        tracemalloc.start()
+
+    for i in range(frames):
+        inicio = time.perf_counter()
+        frame(objeto, i, medidor.tiempos)
+        medidor.frames.append(time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        pico = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    bloques = sys.getallocatedblocks() - bloques
+    colecciones = sum(g['collections'] for g in gc.get_stats()) - colecciones
+    resultado = medidor.resultado(nombre, bloques, colecciones, pico)
+    if extra is not None:
+        resultado.update(extra(objeto))
+    return resultado
+
+
+def _reloj(tiempos, fase, inicio):
+    ahora = time.perf_counter()
+    tiempos[fase] += ahora - inicio
+    return ahora
+
+
+def bench_juego(frames, memoria=False, gpu=False):
+    import juego
+    teclas = TeclasScript(guion_demo())
+
+    def frame(game, i, tiempos):
+        t = time.perf_counter()
+        game.handle_events()
+        t = _reloj(tiempos, 'eventos', t)
+        game.step(teclas(i))
+        t = _reloj(tiempos, 'actualizar', t)
+        game.draw()
+        t = _reloj(tiempos, 'dibujar', t)
+        game.renderer.presentar()
+        _reloj(tiempos, 'presentar', t)
+
+    def extra(game):
+        return {'escena': game.escena.estadisticas(), 'arranque_ms': game.cronometro.tiempos()}
+
+    def crear():
+        return juego.Game(gpu=gpu)
+
+    def extra_gpu(game):
+        datos = extra(game)
+        if gpu and game.gpu is None:
+            datos['aviso'] = "sin texturas de SDL2: se ha usado el renderer por software"
+        return datos
+
+    nombre = 'juego (gpu)' if gpu else 'juego'
+    return _medir(nombre, crear, frame, frames, memoria, extra_gpu)
+
+
+def bench_prueba(frames, memoria=False, enemigos=None, bandada=False, oleadas=None, lobos=0):
+    import prueba
+    teclas = TeclasScript(guion_demo())
+
+    # Veces que el centro de un lobo ha acabado un frame en una celda
+    # bloqueada (un hoyo); tiene que ser siempre 0
+    en_hoyos = 0
+
+    def crear():
+        return prueba.Juego(enemigos or prueba.NUM_ENEMIGOS, bandada=bandada, oleadas=oleadas,
+                            lobos=lobos)
+
+    def frame(partida, i, tiempos):
+        t = time.perf_counter()
+        partida.eventos()
+        t = _reloj(tiempos, 'eventos', t)
+        partida.actualizar(teclas(i))
+        t = _reloj(tiempos, 'actualizar', t)
+        partida.colisiones()
+        t = _reloj(tiempos, 'colisiones', t)
+        zonas = partida.dibujar()
+        t = _reloj(tiempos, 'dibujar', t)
+        partida.presentar(zonas)
+        t = _reloj(tiempos, 'presentar', t)
+        if partida.oleadas is not None:
+            partida.oleadas.preparar(prueba.PRESUPUESTO_OLEADAS)
+            _reloj(tiempos, 'actualizar', t)
+        if partida.campo is not None:
+            nonlocal en_hoyos
+            manada = partida.manada
+            libres = partida.campo.libres(manada.x + manada.w / 2, manada.y + manada.h / 2)
+            en_hoyos += len(libres) - int(libres.sum())
+
+    def extra(partida):
+        datos = {}
+        if partida.campo is not None:
+            datos['lobos'] = {'cantidad': len(partida.manada),
+                              'recalculos': partida.campo.recalculos,
+                              'en_hoyos': en_hoyos}
+        if partida.oleadas is not None:
+            datos['oleadas'] = partida.oleadas.estadisticas()
+        elif partida.pool is not None:
+            datos['pool'] = partida.pool.estadisticas()
+        return datos
+
+    nombre = 'prueba'
+    if bandada:
+        nombre = 'prueba (bandada)'
+    elif oleadas:
+        nombre = f'prueba ({oleadas})'
+    if lobos:
+        nombre += f' + {lobos} lobos'
+    return _medir(nombre, crear, frame, frames, memoria, extra)
+
+
+def bench_repeticion(path, memoria=False):
+    """
+    Mide prueba.py jugando una partida grabada por un jugador real.
+    """
+    from repeticion import Repeticion
+    repeticion = Repeticion(path)
+    desvios = []
+
+    def frame(partida, i, tiempos):
+        t = time.perf_counter()
+        # Los pasos grabados incluyen las colisiones
+        if not repeticion.ejecutar_frame(partida, i):
+            desvios.append(i)
+        t = _reloj(tiempos, 'actualizar', t)
+        zonas = partida.dibujar()
+        t = _reloj(tiempos, 'dibujar', t)
+        partida.presentar(zonas)
+        _reloj(tiempos, 'presentar', t)
+
+    def extra(partida):
+        return {'desvio': desvios[0] if desvios else None}
+
+    return _medir(f'prueba ({path})', repeticion.crear_juego, frame, len(repeticion), memoria, extra)
+
+
+def bench_colisiones(tamanos=(50, 200, 800, 3200), ticks=100):
+    """
+    Compara la búsqueda lineal de pygame (spritecollide/groupcollide) con la
+    rejilla de colisiones.SpatialHash, sola y seguida de la comprobación por
+    máscaras: jugador contra águilas y águilas contra hoyos. El mundo crece
+    con el número de entidades para mantener la densidad, como en un nivel
+    largo.
+    """
+    import pygame
+    from colisiones import SpatialHash
+
+    mascaras = {lado: pygame.mask.from_surface(pygame.image.load(path))
+                for lado, path in ((119, 'imagenes/oveja1.png'), (130, 'imagenes/aguila.png'))}
+
+    def sprite(x, y, lado):
+        s = pygame.sprite.Sprite()
+        s.rect = pygame.Rect(x, y, lado, lado)
+        s.mask = mascaras[lado]
+        return s
+
+    resultados = []
+    for n in tamanos:
+        rng = random.Random(n)
+        ancho = int((n * 500 * 400 / 3) ** 0.5)
+        jugador = sprite(ancho // 2, ancho // 2, 119)
+        aguilas = pygame.sprite.Group(
+            sprite(rng.randrange(ancho), rng.randrange(ancho), 130) for _ in range(n))
+        hoyos = pygame.sprite.Group(
+            sprite(rng.randrange(ancho), rng.randrange(ancho), 130) for _ in range(n // 4))
+        velocidades = {a: rng.randint(2, 5) for a in aguilas}
+
+        def mover():
+            for a in aguilas:
+                v = velocidades[a]
+                a.rect.x = (a.rect.x - v) % ancho
+                a.rect.y = (a.rect.y + v) % ancho
+
+        inicio = time.perf_counter()
+        for _ in range(ticks):
+            mover()
+        t_mover = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for _ in range(ticks):
+            mover()
+            pygame.sprite.spritecollide(jugador, aguilas, False)
+            pygame.sprite.groupcollide(aguilas, hoyos, False, False)
+        t_lineal = time.perf_counter() - inicio - t_mover
+
+        indice_aguilas = SpatialHash()
+        indice_hoyos = SpatialHash()
+        indice_hoyos.actualizar(hoyos)  # los hoyos no se mueven: se indexan una vez
+        inicio = time.perf_counter()
+        for _ in range(ticks):
+            mover()
+            indice_aguilas.actualizar(aguilas)
+            indice_aguilas.colisiones(jugador)
+            list(indice_hoyos.pares(aguilas))
+        t_rejilla = time.perf_counter() - inicio - t_mover
+
+        indice_aguilas.vaciar()
+        inicio = time.perf_counter()
+        for _ in range(ticks):
+            mover()
+            indice_aguilas.actualizar(aguilas)
+            indice_aguilas.colisiones(jugador, pygame.sprite.collide_mask)
+            list(indice_hoyos.pares(aguilas, pygame.sprite.collide_mask))
+        t_mascaras = time.perf_counter() - inicio - t_mover
+
+        resultados.append({
+            'entidades': n + n // 4,
+            'lineal_us_por_entidad': t_lineal * 1e6 / ticks / n,
+            'rejilla_us_por_entidad': t_rejilla * 1e6 / ticks / n,
+            'lineal_ms': t_lineal * 1000 / ticks,
+            'rejilla_ms': t_rejilla * 1000 / ticks,
+            'mascaras_ms': t_mascaras * 1000 / ticks,
+        })
+    return resultados
+
+
+def imprimir_colisiones(resultados):
+    print("colisiones (por tick):")
+    for r in resultados:
+        print(f"    {r['entidades']:6d} entidades: lineal {r['lineal_ms']:8.3f} ms "
+              f"({r['lineal_us_por_entidad']:.2f} us/entidad), rejilla {r['rejilla_ms']:8.3f} ms "
+              f"({r['rejilla_us_por_entidad']:.2f} us/entidad), "
+              f"rejilla + máscaras {r['mascaras_ms']:8.3f} ms")
+
+
+BENCHS = {
+    'juego': bench_juego,
+    'juego-gpu': lambda frames, memoria: bench_juego(frames, memoria, gpu=True),
+    'prueba': bench_prueba,
+}
+
+
+def imprimir(resultado):
+    print(f"{resultado['juego']}: {resultado['frames']} frames, {resultado['fps']:.0f} FPS, "
+          f"p50 {resultado['frame_ms_p50']:.3f} ms, p99 {resultado['frame_ms_p99']:.3f} ms, "
+          f"máx {resultado['frame_ms_max']:.3f} ms")
+    for fase, ms in resultado['fases_ms'].items():
+        print(f"    {fase:<12}{ms:8.4f} ms/frame")
+    print(f"    bloques asignados: {resultado['bloques_asignados']:+d}, "
+          f"colecciones gc: {resultado['colecciones_gc']}")
+    if 'pool' in resultado:
+        pool = resultado['pool']
+        print(f"    pool de enemigos: {pool['aciertos']} aciertos, {pool['fallos']} fallos, "
+              f"{pool['en_uso']}/{pool['capacidad']} en uso")
+    if 'lobos' in resultado:
+        lobos = resultado['lobos']
+        print(f"    lobos: {lobos['cantidad']}, campo de flujo recalculado {lobos['recalculos']} veces "
+              f"en {resultado['frames']} frames, {lobos['en_hoyos']} veces dentro de un hoyo")
+    if 'oleadas' in resultado:
+        oleadas = resultado['oleadas']
+        print(f"    oleadas: {oleadas['preparados']} enemigos preparados "
+              f"({oleadas['por_preparar']} pendientes), {oleadas['activas']} oleadas activas, "
+              f"{oleadas['por_empezar']} por empezar")
+        for tipo, pool in oleadas['pools'].items():
+            print(f"        {tipo}: {pool['en_uso']}/{pool['capacidad']} en uso, "
+                  f"{pool['fallos']} creados sin preparar")
+    if 'escena' in resultado:
+        escena = resultado['escena']
+        print(f"    escena: {escena['chunks']} trozos y {escena['objetos']} objetos cargados "
+              f"(máx {escena['max_objetos']}, {escena['dibujados']} dibujados), {escena['cargas']} cargas, "
+              f"{escena['descargas']} descargas")
+    if 'arranque_ms' in resultado:
+        print("    arranque: " + ", ".join(f"{etapa} {ms:.1f} ms"
+                                         for etapa, ms in resultado['arranque_ms'].items()))
+    if 'aviso' in resultado:
+        print(f"    {resultado['aviso']}")
+    if resultado.get('desvio') is not None:
+        print(f"    la repetición se desvía en el frame {resultado['desvio']}")
+    if resultado['pico_memoria_kb'] is not None:
+        print(f"    pico de memoria (tracemalloc): {resultado['pico_memoria_kb']:.1f} KB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del bucle de juego sin ventana")
+    parser.add_argument('juego', nargs='?', default='todos',
+                        choices=[*BENCHS, 'colisiones', 'todos'])
+    parser.add_argument('--frames', type=int, default=5000)
+    parser.add_argument('--enemigos', type=int,
+                        help="número de águilas en prueba")
+    parser.add_argument('--bandada', action='store_true',
+                        help="águilas de prueba en arrays de NumPy (entidades.Bandada)")
+    parser.add_argument('--oleadas', metavar='TABLA',
+                        help="prueba saca los enemigos por oleadas según esta tabla")
+    parser.add_argument('--lobos', type=int, default=0,
+                        help="lobos que persiguen a la oveja en prueba")
+    parser.add_argument('--repeticion', metavar='ARCHIVO',
+                        help="prueba juega esta partida grabada (ignora --frames)")
+    parser.add_argument('--memoria', action='store_true',
+                        help="medir el pico de memoria con tracemalloc (más lento)")
+    parser.add_argument('--json', help="guardar los resultados en este archivo")
+    parser.add_argument('--min-fps', type=float,
+                        help="fallar si algún juego no llega a estos FPS")
+    args = parser.parse_args(argv)
+
+    configurar_headless()
+    import pygame
+    from recursos import assets
+
+    if args.juego == 'colisiones':
+        resultados = bench_colisiones()
+        imprimir_colisiones(resultados)
+        if args.json:
+            with open(args.json, 'w') as archivo:
+                json.dump(resultados, archivo, indent=2)
+        return 0
+
+    nombres = list(BENCHS) if args.juego == 'todos' else [args.juego]
+    resultados = []
+    for nombre in nombres:
+        if nombre == 'prueba' and args.repeticion:
+            resultado = bench_repeticion(args.repeticion, args.memoria)
+        elif nombre == 'prueba':
+            resultado = bench_prueba(args.frames, args.memoria, args.enemigos, args.bandada,
+                                     args.oleadas, args.lobos)
+        else:
+            resultado = BENCHS[nombre](args.frames, args.memoria)
+        pygame.quit()
+        # Cada juego arranca con la caché vacía
+        assets.vaciar()
+        imprimir(resultado)
+        resultados.append(resultado)
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+    en_hoyos = [r['juego'] for r in resultados if r.get('lobos', {}).get('en_hoyos')]
+    if en_hoyos:
+        print(f"Lobos dentro de un hoyo: {', '.join(en_hoyos)}")
+        return 1
+    if args.min_fps is not None:
+        lentos = [r['juego'] for r in resultados if r['fps'] < args.min_fps]
+        if lentos:
+            print(f"Por debajo de {args.min_fps:.0f} FPS: {', '.join(lentos)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
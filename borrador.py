@@ -1,6 +1,7 @@
 import pygame
 import sys
 from pygame.locals import *
+from recursos import assets
 
 # Constantes de configuración
 WIDTH, HEIGHT = 500, 400
@@ -9,6 +10,7 @@ BLACK = (0, 0, 0)
 MIN_VOLUME = 0.0
 MAX_VOLUME = 1.0
 VOLUME_STEP = 0.05
+ICON_SIZE = (32, 32)
 
 class SoundManager:
     def __init__(self, music_path, sonido_img, mute_img, icon_position):
@@ -22,10 +24,10 @@ class SoundManager:
             pygame.quit()
             sys.exit()
 
-        # Cargar iconos de sonido
+        # Cargar iconos de sonido ya escalados a su tamaño en pantalla
         try:
-            self.sonido = pygame.image.load(sonido_img).convert_alpha()
-            self.mute = pygame.image.load(mute_img).convert_alpha()
+            self.sonido = assets.imagen(sonido_img, ICON_SIZE)
+            self.mute = assets.imagen(mute_img, ICON_SIZE)
         except pygame.error as e:
             print(f"Error al cargar los iconos de sonido: {e}")
             pygame.quit()
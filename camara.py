@@ -0,0 +1,86 @@
+import math
+
+import pygame
+
+
+class Camara:
+    """
+    Ventana de ancho x alto píxeles sobre el mundo.
+
+    Las entidades guardan su posición en coordenadas del mundo; la cámara las
+    pasa a coordenadas de pantalla y dice cuáles se ven, para no dibujar (ni
+    actualizar a cada paso) las que están fuera. Se mueve una vez por paso de
+    simulación y al dibujar se interpola entre el paso anterior y el actual,
+    igual que el resto de entidades. Con limites (un pygame.Rect del mundo) no
+    se sale de él.
+    """
+    def __init__(self, ancho, alto, limites=None):
+        self.ancho = ancho
+        self.alto = alto
+        self.limites = limites
+        self.x = 0.0
+        self.y = 0.0
+        self.x_anterior = 0.0
+        self.y_anterior = 0.0
+        # Posición (con decimales) con la que se dibuja el frame en curso
+        self.x_dibujo = 0.0
+        self.y_dibujo = 0.0
+        # Zona del mundo que se ve en el frame en curso
+        self.vista = pygame.Rect(0, 0, ancho, alto)
+
+    def _limitar(self):
+        if self.limites is None:
+            return
+        self.x = min(max(self.x, self.limites.left), self.limites.right - self.ancho)
+        self.y = min(max(self.y, self.limites.top), self.limites.bottom - self.alto)
+
+    def mover(self, dx, dy=0.0):
+        """
+        Desplaza la cámara un paso de simulación.
+        """
+        self.x_anterior, self.y_anterior = self.x, self.y
+        self.x += dx
+        self.y += dy
+        self._limitar()
+
+    def seguir(self, x, y, suavizado=1.0):
+        """
+        Acerca la cámara un paso a la posición que deja el punto (x, y) del
+        mundo en el centro de la pantalla. Con suavizado 1 llega de golpe; con
+        valores menores recorre esa fracción de la distancia en cada paso.
+        """
+        self.mover((x - self.ancho / 2 - self.x) * suavizado,
+                   (y - self.alto / 2 - self.y) * suavizado)
+
+    @property
+    def rect(self):
+        """
+        Zona del mundo que se ve en la posición simulada (sin interpolar).
+        """
+        return pygame.Rect(math.floor(self.x + 0.5), math.floor(self.y + 0.5),
+                           self.ancho, self.alto)
+
+    def interpolar(self, alpha=1.0):
+        """
+        Calcula la posición con la que se dibuja el frame. Devuelve True si la
+        vista se ha movido algún píxel.
+        """
+        self.x_dibujo = self.x_anterior + (self.x - self.x_anterior) * alpha
+        self.y_dibujo = self.y_anterior + (self.y - self.y_anterior) * alpha
+        x = math.floor(self.x_dibujo + 0.5)
+        y = math.floor(self.y_dibujo + 0.5)
+        movida = (x, y) != self.vista.topleft
+        self.vista.topleft = (x, y)
+        return movida
+
+    def a_pantalla(self, x, y):
+        """
+        Posición en pantalla del punto (x, y) del mundo en el frame en curso.
+        """
+        return (math.floor(x + 0.5) - self.vista.x, math.floor(y + 0.5) - self.vista.y)
+
+    def visible(self, rect):
+        """
+        True si rect (en coordenadas del mundo) se ve en el frame en curso.
+        """
+        return self.vista.colliderect(rect)
@@ -0,0 +1,107 @@
+class SpatialHash:
+    """
+    Índice espacial de sprites en una rejilla uniforme.
+
+    Cada sprite se guarda en las celdas que toca su rect. Las consultas solo
+    miran las celdas alrededor del rect buscado, así que su coste no depende
+    del número total de sprites sino de cuántos hay cerca. Al mover un sprite
+    solo se toca la rejilla si ha cambiado de celdas.
+    """
+    def __init__(self, celda=128):
+        self.celda = celda
+        # (cx, cy) -> {sprite: None}; un dict mantiene el orden de inserción
+        self.celdas = {}
+        # sprite -> (x0, y0, x1, y1) celdas que ocupa
+        self._rangos = {}
+
+    def __len__(self):
+        return len(self._rangos)
+
+    def __contains__(self, sprite):
+        return sprite in self._rangos
+
+    def _rango(self, rect):
+        c = self.celda
+        return (rect.left // c, rect.top // c,
+                (rect.right - 1) // c, (rect.bottom - 1) // c)
+
+    def insertar(self, sprite):
+        rango = self._rango(sprite.rect)
+        self._rangos[sprite] = rango
+        x0, y0, x1, y1 = rango
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.celdas.setdefault((cx, cy), {})[sprite] = None
+
+    def quitar(self, sprite):
+        rango = self._rangos.pop(sprite, None)
+        if rango is None:
+            return
+        x0, y0, x1, y1 = rango
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                celda = self.celdas[(cx, cy)]
+                del celda[sprite]
+                if not celda:
+                    del self.celdas[(cx, cy)]
+
+    def mover(self, sprite):
+        """
+        Actualiza un sprite que ya está en el índice tras cambiar su rect.
+        """
+        if self._rango(sprite.rect) != self._rangos[sprite]:
+            self.quitar(sprite)
+            self.insertar(sprite)
+
+    def actualizar(self, sprites):
+        """
+        Sincroniza el índice con un grupo: mueve los sprites que ya estaban,
+        añade los nuevos y quita los que ya no están en el grupo.
+        """
+        rangos = self._rangos
+        for sprite in sprites:
+            if sprite in rangos:
+                self.mover(sprite)
+            else:
+                self.insertar(sprite)
+        if len(rangos) > len(sprites):
+            for sprite in [s for s in rangos if s not in sprites]:
+                self.quitar(sprite)
+
+    def vaciar(self):
+        self.celdas.clear()
+        self._rangos.clear()
+
+    def consultar(self, rect):
+        """
+        Devuelve los sprites cuyo rect se solapa con rect.
+        """
+        x0, y0, x1, y1 = self._rango(rect)
+        candidatos = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                celda = self.celdas.get((cx, cy))
+                if celda:
+                    candidatos.update(celda)
+        return [s for s in candidatos if rect.colliderect(s.rect)]
+
+    def colisiones(self, sprite, collided=None):
+        """
+        Como pygame.sprite.spritecollide pero usando el índice. collided es una
+        comprobación fina opcional, p. ej. pygame.sprite.collide_mask.
+        """
+        encontrados = self.consultar(sprite.rect)
+        if collided is not None:
+            encontrados = [s for s in encontrados if s is not sprite and collided(sprite, s)]
+        else:
+            encontrados = [s for s in encontrados if s is not sprite]
+        return encontrados
+
+    def pares(self, sprites, collided=None):
+        """
+        Genera (sprite, otro) para cada sprite de sprites que choca con alguno
+        del índice, p. ej. enemigos contra los peligros indexados.
+        """
+        for sprite in sprites:
+            for otro in self.colisiones(sprite, collided):
+                yield sprite, otro
@@ -0,0 +1,181 @@
+"""
+Paso de compilación: empaqueta las imágenes del juego en un atlas.
+
+Genera imagenes/atlas.bin con todas las imágenes colocadas en una sola hoja de
+píxeles RGBA sin comprimir y un índice con la posición de cada una. Al
+arrancar, recursos.AssetCache abre ese archivo una vez (con mmap) y recorta
+las imágenes como subsuperficies, sin decodificar ningún PNG. Si se pide una imagen
+más grande de lo que se guardó, se lee el PNG en su lugar.
+
+El índice guarda también el tamaño, la fecha y la suma de cada PNG. Sin
+argumentos el atlas solo se rehace si está atrasado (algún PNG o el tamaño
+al que lo dibuja algún nivel ha cambiado); con --comprobar no se rehace y
+se termina con código 1 si lo está. Hay que ejecutarlo antes de
+pyinstaller juego.spec / prueba.spec, porque el ejecutable ya no compara
+el atlas con los PNG:
+
+    python empaquetar.py
+    python empaquetar.py --comprobar
+"""
+import argparse
+import glob
+import json
+import struct
+import sys
+
+import pygame
+
+from recursos import Atlas, ATLAS_MAGIC, ATLAS_PATH, ATLAS_VERSION, firma_archivo, suma_archivo
+
+ANCHO_ATLAS = 512
+SEPARACION = 1
+
+# Imágenes que van al atlas y el tamaño al que se guardan (None = original).
+# Los iconos se guardan ya reducidos a su tamaño en pantalla. Las imágenes de
+# los niveles se añaden solas con el tamaño al que las dibuja cada nivel
+# (ver calcular_contenido()).
+CONTENIDO = {
+    'imagenes/fondo.png': None,
+    'imagenes/oveja1.png': None,
+    'imagenes/oveja2.png': None,
+    'imagenes/oveja3.png': None,
+    'imagenes/oveja4.png': None,
+    'imagenes/oveja5.png': None,
+    'imagenes/oveja6.png': None,
+    'imagenes/caido.png': None,
+    'imagenes/aguila.png': None,
+    'imagenes/lobo.png': None,
+    'imagenes/oveja.png': (32, 32),
+    'imagenes/sonido.png': (32, 32),
+    'imagenes/mute.png': (32, 32),
+}
+NIVELES = 'niveles/*.jsonl'
+
+
+def calcular_contenido(fijo=CONTENIDO, niveles=NIVELES):
+    """
+    CONTENIDO más las imágenes de los niveles. Cada imagen se guarda al mayor
+    tamaño al que se dibuja, o a su tamaño original si en algún sitio se
+    dibuja así: lo que solo se ve reducido no ocupa más de lo que se ve.
+    """
+    usos = {path: [size] for path, size in fijo.items()}
+    for path in sorted(glob.glob(niveles)):
+        with open(path, 'rb') as archivo:
+            cabecera = json.loads(archivo.readline())
+        # En la carpeta de niveles también están las tablas de oleadas
+        if not isinstance(cabecera, dict) or 'tipos' not in cabecera:
+            continue
+        for tipo in cabecera['tipos'].values():
+            tamano = tipo.get('tamano')
+            usos.setdefault(tipo['imagen'], []).append(tuple(tamano) if tamano else None)
+    return {path: None if None in sizes else max(sizes, key=lambda s: s[0] * s[1])
+            for path, sizes in usos.items()}
+
+
+def colocar(tamanos, ancho):
+    """
+    Empaquetado por estantes: las imágenes se ordenan de más alta a más baja
+    y se colocan en filas de izquierda a derecha. Devuelve las posiciones y la
+    altura total del atlas.
+    """
+    posiciones = {}
+    x = y = alto_fila = 0
+    for path, (w, h) in sorted(tamanos.items(), key=lambda item: -item[1][1]):
+        if w > ancho:
+            raise ValueError(f"{path} es más ancha que el atlas ({w} > {ancho})")
+        if x + w > ancho:
+            x = 0
+            y += alto_fila + SEPARACION
+            alto_fila = 0
+        posiciones[path] = (x, y)
+        x += w + SEPARACION
+        alto_fila = max(alto_fila, h)
+    return posiciones, y + alto_fila
+
+
+def empaquetar(destino=ATLAS_PATH, contenido=None, ancho=ANCHO_ATLAS):
+    if contenido is None:
+        contenido = calcular_contenido()
+    imagenes = {}
+    originales = {}
+    for path, size in contenido.items():
+        imagen = pygame.image.load(path)
+        originales[path] = [*imagen.get_size(), *firma_archivo(path), suma_archivo(path)]
+        if imagen.get_bitsize() != 32:
+            # Pasar a RGBA de 32 bits sin necesitar una pantalla abierta
+            copia = pygame.Surface(imagen.get_size(), pygame.SRCALPHA, 32)
+            copia.blit(imagen, (0, 0))
+            imagen = copia
+        if size is not None and imagen.get_size() != tuple(size):
+            imagen = pygame.transform.smoothscale(imagen, size)
+        imagenes[path] = imagen
+
+    posiciones, alto = colocar({p: i.get_size() for p, i in imagenes.items()}, ancho)
+
+    hoja = pygame.Surface((ancho, alto), pygame.SRCALPHA, 32)
+    indice = {}
+    for path, imagen in imagenes.items():
+        x, y = posiciones[path]
+        hoja.blit(imagen, (x, y))
+        indice[path] = [x, y, imagen.get_width(), imagen.get_height(), *originales[path]]
+
+    datos_indice = json.dumps(indice, sort_keys=True).encode('utf-8')
+    with open(destino, 'wb') as archivo:
+        archivo.write(struct.pack('<8sIIII', ATLAS_MAGIC, ATLAS_VERSION,
+                                  len(datos_indice), ancho, alto))
+        archivo.write(datos_indice)
+        archivo.write(pygame.image.tobytes(hoja, 'RGBA'))
+    return indice, (ancho, alto)
+
+
+def atrasadas(destino=ATLAS_PATH, contenido=None):
+    """
+    Imágenes por las que hay que rehacer el atlas: las que faltan o sobran,
+    las guardadas a otro tamaño del que pide contenido y aquellas cuyo PNG ha
+    cambiado. Si no hay atlas válido devuelve [destino].
+    """
+    if contenido is None:
+        contenido = calcular_contenido()
+    try:
+        indice = Atlas(destino).indice
+    except (OSError, ValueError, struct.error):
+        return [destino]
+    cambiadas = sorted(set(indice) ^ set(contenido))
+    for path, size in contenido.items():
+        entrada = indice.get(path)
+        if entrada is None:
+            continue
+        _, _, ancho, alto, ancho_original, alto_original, tamano, fecha, suma = entrada
+        pedido = tuple(size) if size is not None else (ancho_original, alto_original)
+        if ((ancho, alto) != pedido
+                or [tamano, fecha] != list(firma_archivo(path)) or suma != suma_archivo(path)):
+            cambiadas.append(path)
+    return cambiadas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Empaquetar las imágenes en un atlas")
+    parser.add_argument('destino', nargs='?', default=ATLAS_PATH)
+    parser.add_argument('--comprobar', action='store_true',
+                        help="no rehacer el atlas; terminar con código 1 si está atrasado")
+    parser.add_argument('--forzar', action='store_true',
+                        help="rehacer el atlas aunque esté al día")
+    args = parser.parse_args(argv)
+
+    cambiadas = [] if args.forzar else atrasadas(args.destino)
+    if args.comprobar:
+        if cambiadas:
+            print(f"{args.destino} está atrasado: {', '.join(cambiadas)}")
+            return 1
+        print(f"{args.destino} está al día")
+        return 0
+    if not args.forzar and not cambiadas:
+        print(f"{args.destino} ya está al día")
+        return 0
+    indice, (ancho, alto) = empaquetar(args.destino)
+    print(f"{args.destino}: {len(indice)} imágenes en un atlas de {ancho}x{alto}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
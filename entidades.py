@@ -0,0 +1,141 @@
+import numpy as np
+
+
+class Enjambre:
+    """
+    Muchas entidades iguales guardadas como arrays de NumPy.
+
+    En lugar de un pygame.sprite.Sprite por entidad, las posiciones y
+    velocidades viven en arrays y se actualizan de una vez. Todas comparten
+    la misma imagen y se dibujan con una sola llamada a Surface.blits. No
+    se usa directamente: cada subclase define cómo se mueven (update) y
+    dónde aparecen (reaparecer(indices), que también usa reiniciar).
+    """
+    def __init__(self, imagen, cantidad, ancho, alto, mascara=None, semilla=None,
+                 dtype=np.int32):
+        self.imagen = imagen
+        self.mascara = mascara
+        self.w, self.h = imagen.get_size()
+        self.ancho = ancho
+        self.alto = alto
+        self.rng = np.random.default_rng(semilla)
+        self.x = np.zeros(cantidad, dtype=dtype)
+        self.y = np.zeros(cantidad, dtype=dtype)
+        self.velocidad = np.zeros(cantidad, dtype=dtype)
+        self.reiniciar()
+
+    def __len__(self):
+        return len(self.x)
+
+    def reiniciar(self):
+        self.reaparecer(np.arange(len(self.x)))
+
+    def visibles(self, vista=None):
+        """
+        Índices de las entidades que se ven en pantalla o, si se da, en la
+        zona vista del mundo (un pygame.Rect).
+        """
+        if vista is None:
+            return np.flatnonzero((self.x < self.ancho) & (self.x + self.w > 0)
+                                  & (self.y < self.alto) & (self.y + self.h > 0))
+        return np.flatnonzero((self.x < vista.right) & (self.x + self.w > vista.left)
+                              & (self.y < vista.bottom) & (self.y + self.h > vista.top))
+
+    def colisiones(self, rect, mascara=None):
+        """
+        Índices de las entidades que chocan con rect. Primero se comparan los
+        rectángulos de todas a la vez y, si se da mascara, se comprueba píxel
+        a píxel solo en las que solapan.
+        """
+        solapan = np.flatnonzero((self.x < rect.right) & (self.x + self.w > rect.left)
+                                 & (self.y < rect.bottom) & (self.y + self.h > rect.top))
+        if mascara is None or self.mascara is None or not solapan.size:
+            return solapan
+        return np.array([i for i in solapan.tolist()
+                         if mascara.overlap(self.mascara, (int(self.x[i]) - rect.x,
+                                                           int(self.y[i]) - rect.y))],
+                        dtype=np.intp)
+
+    def draw(self, pantalla, vista=None):
+        """
+        Dibuja las entidades visibles. Con vista (la zona del mundo que ve la
+        cámara) se dibujan desplazadas a coordenadas de pantalla.
+        """
+        indices = self.visibles(vista)
+        x = self.x[indices].astype(np.intp)
+        y = self.y[indices].astype(np.intp)
+        if vista is not None:
+            x = x - vista.x
+            y = y - vista.y
+        imagen = self.imagen
+        # Un generador y no una lista: con miles de entidades la lista de
+        # tuplas vivas a la vez hace saltar al recolector de basura
+        pantalla.blits(((imagen, posicion) for posicion in zip(x.tolist(), y.tolist())),
+                       doreturn=False)
+
+
+class Bandada(Enjambre):
+    """
+    Todas las águilas de la partida: se mueven en diagonal y las que salen
+    de la pantalla reaparecen por arriba, con los números aleatorios sacados
+    en bloque.
+    """
+    def reaparecer(self, indices):
+        """
+        Coloca las águilas indicadas fuera de la pantalla, por arriba, con una
+        velocidad nueva (igual que Enemigo.update en prueba.py).
+        """
+        n = len(indices)
+        self.x[indices] = self.rng.integers(0, self.ancho - self.w, size=n)
+        self.y[indices] = self.rng.integers(-100, -40, size=n)
+        self.velocidad[indices] = self.rng.integers(2, 6, size=n)
+
+    def update(self):
+        self.x -= self.velocidad
+        self.y += self.velocidad
+        # Reiniciar las que salen de la pantalla
+        fuera = np.flatnonzero((self.y > self.alto) | (self.x + self.w < 0))
+        if fuera.size:
+            self.reaparecer(fuera)
+
+
+class Manada(Enjambre):
+    """
+    Lobos que persiguen al jugador. No buscan cada uno su camino: todos leen
+    a la vez la dirección de su celda en un campo de flujo compartido
+    (flujo.CampoFlujo) y avanzan su velocidad en ella. Las posiciones tienen
+    decimales para que el paso en diagonal mida lo mismo que el recto.
+
+    Aparecen por los lados de la pantalla, con la parte de arriba entre
+    suelo[0] y suelo[1].
+    """
+    def __init__(self, imagen, cantidad, ancho, alto, mascara=None, semilla=None,
+                 suelo=(0, None), velocidades=(1.5, 3.5)):
+        self.suelo = (suelo[0], alto - imagen.get_height() if suelo[1] is None else suelo[1])
+        self.velocidades = velocidades
+        super().__init__(imagen, cantidad, ancho, alto, mascara, semilla, dtype=np.float64)
+
+    def reaparecer(self, indices):
+        n = len(indices)
+        izquierda = self.rng.integers(0, 2, size=n).astype(bool)
+        self.x[indices] = np.where(izquierda, -self.w, self.ancho)
+        self.y[indices] = self.rng.uniform(self.suelo[0], self.suelo[1], size=n)
+        self.velocidad[indices] = self.rng.uniform(*self.velocidades, size=n)
+
+    def update(self, campo):
+        """
+        Un paso hacia el objetivo del campo, siguiendo las direcciones desde
+        el centro de cada lobo. El centro nunca entra en una celda bloqueada:
+        si el paso acaba en una, el lobo se desliza solo en horizontal o solo
+        en vertical y, si tampoco puede, se queda quieto.
+        """
+        x = self.x + self.w / 2
+        y = self.y + self.h / 2
+        dx, dy = campo.direcciones(x, y)
+        dx = dx * self.velocidad
+        dy = dy * self.velocidad
+        libre = campo.libres(x + dx, y + dy)
+        solo_x = ~libre & campo.libres(x + dx, y)
+        solo_y = ~libre & ~solo_x & campo.libres(x, y + dy)
+        self.x += np.where(libre | solo_x, dx, 0.0)
+        self.y += np.where(libre | solo_y, dy, 0.0)
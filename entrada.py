@@ -0,0 +1,105 @@
+import time
+from collections import deque
+
+import pygame
+
+
+class EstadoTeclas:
+    """
+    Estado del teclado para un paso de simulación: una tecla cuenta como
+    pulsada si está mantenida o si se pulsó desde el último paso, aunque ya se
+    haya soltado. Así no se pierden los toques rápidos entre dos frames.
+    """
+    __slots__ = ('mantenidas', 'pulsadas')
+
+    def __init__(self, mantenidas, pulsadas):
+        self.mantenidas = mantenidas
+        self.pulsadas = pulsadas
+
+    def __getitem__(self, tecla):
+        return self.mantenidas[tecla] or tecla in self.pulsadas
+
+
+class Entrada:
+    """
+    Recoge los eventos una vez por frame y los reparte.
+
+    Las teclas se asocian a acciones y las acciones a funciones (tabla de
+    asignaciones) en lugar de una cadena de if/elif. Cada pulsación se guarda
+    con su hora en un buffer hasta que la simulación la consume, y se mide
+    cuánto tarda en consumirse (latencia de entrada).
+    """
+    def __init__(self, tipos_permitidos=(pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP)):
+        self.tipos_permitidos = tuple(tipos_permitidos)
+        self.teclas = {}        # tecla -> acción
+        self.manejadores = {}   # acción -> función
+        self.eventos = {}       # tipo de evento -> función
+        # (hora, tecla) de las pulsaciones que aún no ha visto la simulación
+        self.buffer = deque()
+        self.latencias = deque(maxlen=240)
+        self.salir = False
+
+    def filtrar(self):
+        """
+        Deja pasar a la cola de SDL solo los eventos que se usan. Requiere que
+        ya exista la pantalla.
+        """
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self.tipos_permitidos) + list(self.eventos))
+
+    def asignar(self, tecla, accion, manejador=None):
+        self.teclas[tecla] = accion
+        if manejador is not None:
+            self.manejadores[accion] = manejador
+
+    def al_evento(self, tipo, manejador):
+        self.eventos[tipo] = manejador
+
+    def procesar(self):
+        """
+        Vacía la cola de eventos: guarda las pulsaciones en el buffer y ejecuta
+        las acciones asignadas.
+        """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.salir = True
+            elif event.type == pygame.KEYDOWN:
+                self.buffer.append((time.perf_counter(), event.key))
+                manejador = self.manejadores.get(self.teclas.get(event.key))
+                if manejador is not None:
+                    manejador()
+            else:
+                manejador = self.eventos.get(event.type)
+                if manejador is not None:
+                    manejador()
+
+    def estado(self, mantenidas=None):
+        """
+        Estado de las teclas para el próximo paso de simulación.
+        """
+        if mantenidas is None:
+            mantenidas = pygame.key.get_pressed()
+        return EstadoTeclas(mantenidas, {tecla for _, tecla in self.buffer})
+
+    def consumir(self):
+        """
+        La simulación ya ha visto las pulsaciones del buffer: se anotan sus
+        latencias y se vacía.
+        """
+        if not self.buffer:
+            return
+        ahora = time.perf_counter()
+        for hora, _ in self.buffer:
+            self.latencias.append(ahora - hora)
+        self.buffer.clear()
+
+    def metricas(self):
+        """
+        Latencia media y máxima (ms) de las últimas pulsaciones.
+        """
+        if not self.latencias:
+            return None
+        return {
+            'media_ms': sum(self.latencias) * 1000 / len(self.latencias),
+            'max_ms': max(self.latencias) * 1000,
+        }
@@ -0,0 +1,184 @@
+"""
+Campo de flujo para que muchos enemigos persigan al jugador esquivando
+obstáculos.
+
+En lugar de buscar un camino por enemigo, se calcula una sola vez la
+distancia de cada celda de una rejilla hasta la celda del jugador (búsqueda
+en anchura, expandiendo el frente entero con operaciones de NumPy) y, a
+partir de ella, hacia dónde hay que moverse en cada celda. Solo se recalcula
+cuando el jugador cambia de celda; cada enemigo solo tiene que leer la
+dirección de la celda en la que está, y direcciones() lo hace para todos a
+la vez.
+
+Los enemigos nunca deben pisar una celda bloqueada: si el jugador está
+encima de una, el objetivo pasa a ser la celda libre más cercana, y quien
+los mueve puede comprobar con libres() que el paso no acaba en una.
+"""
+import numpy as np
+
+# Vecinos de cada celda: primero los cuatro ortogonales, luego las diagonales
+VECINOS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+INALCANZABLE = np.iinfo(np.int32).max
+
+
+class CampoFlujo:
+    """
+    Rejilla de ancho x alto píxeles en celdas de celda píxeles. bloqueadas
+    es un array de booleanos (filas, columnas) con las celdas por las que no
+    se puede pasar; se puede rellenar con bloquear().
+    """
+    def __init__(self, ancho, alto, celda=20):
+        self.celda = celda
+        self.columnas = -(-ancho // celda)
+        self.filas = -(-alto // celda)
+        self.bloqueadas = np.zeros((self.filas, self.columnas), dtype=bool)
+        self.distancias = np.full((self.filas, self.columnas), INALCANZABLE, dtype=np.int32)
+        # Dirección (unitaria) a seguir en cada celda; (0, 0) donde no hay camino
+        self.dx = np.zeros((self.filas, self.columnas), dtype=np.float32)
+        self.dy = np.zeros((self.filas, self.columnas), dtype=np.float32)
+        self.objetivo = None
+        self.destino = (0.0, 0.0)
+        self.recalculos = 0
+
+    def bloquear(self, rect, margen=0):
+        """
+        Marca como bloqueadas las celdas cuyo centro cae dentro de rect
+        (ampliado margen píxeles por cada lado).
+        """
+        c = self.celda
+        centros_x = np.arange(self.columnas) * c + c / 2
+        centros_y = np.arange(self.filas) * c + c / 2
+        columnas = (centros_x >= rect.left - margen) & (centros_x < rect.right + margen)
+        filas = (centros_y >= rect.top - margen) & (centros_y < rect.bottom + margen)
+        self.bloqueadas |= filas[:, None] & columnas[None, :]
+        # El campo calculado ya no vale
+        self.objetivo = None
+
+    def _celda(self, x, y):
+        return (min(max(int(y // self.celda), 0), self.filas - 1),
+                min(max(int(x // self.celda), 0), self.columnas - 1))
+
+    def _libre_mas_cercana(self, x, y):
+        """
+        Celda libre cuyo centro está más cerca de (x, y), o None si no hay
+        ninguna.
+        """
+        filas, columnas = np.nonzero(~self.bloqueadas)
+        if not filas.size:
+            return None
+        c = self.celda
+        distancias = np.hypot((columnas + 0.5) * c - x, (filas + 0.5) * c - y)
+        i = int(np.argmin(distancias))
+        return int(filas[i]), int(columnas[i])
+
+    def actualizar(self, x, y):
+        """
+        Apunta el campo al punto (x, y). Solo se recalcula si ha cambiado de
+        celda; devuelve True en ese caso. Si (x, y) cae en una celda
+        bloqueada se apunta al centro de la celda libre más cercana.
+        """
+        self.destino = (float(x), float(y))
+        objetivo = self._celda(x, y)
+        if self.bloqueadas[objetivo]:
+            libre = self._libre_mas_cercana(x, y)
+            if libre is not None:
+                objetivo = libre
+                self.destino = ((libre[1] + 0.5) * self.celda, (libre[0] + 0.5) * self.celda)
+        if objetivo == self.objetivo:
+            return False
+        self.objetivo = objetivo
+        self._distancias(objetivo)
+        self._direcciones()
+        self.recalculos += 1
+        return True
+
+    def _distancias(self, objetivo):
+        """
+        Búsqueda en anchura desde el objetivo con vecinos ortogonales: cada
+        vuelta avanza todo el frente una celda.
+        """
+        distancias = self.distancias
+        distancias.fill(INALCANZABLE)
+        libres = ~self.bloqueadas
+        frente = np.zeros_like(libres)
+        frente[objetivo] = True
+        distancias[objetivo] = 0
+        visitadas = frente.copy()
+        d = 0
+        while frente.any():
+            d += 1
+            nuevo = np.zeros_like(frente)
+            nuevo[1:, :] |= frente[:-1, :]
+            nuevo[:-1, :] |= frente[1:, :]
+            nuevo[:, 1:] |= frente[:, :-1]
+            nuevo[:, :-1] |= frente[:, 1:]
+            nuevo &= libres & ~visitadas
+            distancias[nuevo] = d
+            visitadas |= nuevo
+            frente = nuevo
+
+    def _direcciones(self):
+        """
+        En cada celda, dirección hacia el vecino más cercano al objetivo. Las
+        diagonales solo valen si las dos celdas ortogonales de al lado están
+        libres, para no cortar esquinas de los obstáculos. Las celdas sin
+        ningún vecino alcanzable (el objetivo, las aisladas y el interior de
+        los obstáculos) se quedan en (0, 0).
+        """
+        filas, columnas = self.filas, self.columnas
+        # Rodear con un borde inalcanzable para leer los vecinos sin salirse
+        borde = np.full((filas + 2, columnas + 2), INALCANZABLE, dtype=np.int32)
+        borde[1:-1, 1:-1] = self.distancias
+
+        def vecino(dx, dy):
+            return borde[1 + dy:1 + dy + filas, 1 + dx:1 + dx + columnas]
+
+        mejor = self.distancias.copy()
+        dx = np.zeros((filas, columnas), dtype=np.float32)
+        dy = np.zeros((filas, columnas), dtype=np.float32)
+        for vx, vy in VECINOS:
+            d = vecino(vx, vy)
+            if vx and vy:
+                d = np.where((vecino(vx, 0) == INALCANZABLE) | (vecino(0, vy) == INALCANZABLE),
+                             INALCANZABLE, d)
+            mejora = d < mejor
+            mejor = np.where(mejora, d, mejor)
+            norma = np.hypot(vx, vy)
+            dx[mejora] = vx / norma
+            dy[mejora] = vy / norma
+        self.dx = dx
+        self.dy = dy
+
+    def direcciones(self, x, y):
+        """
+        Dirección unitaria a seguir desde cada punto (arrays de x e y). En la
+        celda del objetivo, que siempre está libre, se va en línea recta
+        hacia el destino; donde el campo no tiene camino, (0, 0).
+        """
+        filas = np.clip((y // self.celda).astype(np.intp), 0, self.filas - 1)
+        columnas = np.clip((x // self.celda).astype(np.intp), 0, self.columnas - 1)
+        dx = self.dx[filas, columnas]
+        dy = self.dy[filas, columnas]
+        if self.objetivo is None or self.bloqueadas[self.objetivo]:
+            return dx, dy
+        directo = (filas == self.objetivo[0]) & (columnas == self.objetivo[1])
+        if directo.any():
+            rx = self.destino[0] - x[directo]
+            ry = self.destino[1] - y[directo]
+            norma = np.hypot(rx, ry)
+            norma[norma == 0] = 1.0
+            dx[directo] = rx / norma
+            dy[directo] = ry / norma
+        return dx, dy
+
+    def libres(self, x, y):
+        """
+        Si cada punto (arrays de x e y) está en una celda libre. Fuera de la
+        rejilla todo está libre.
+        """
+        filas = np.floor_divide(y, self.celda).astype(np.intp)
+        columnas = np.floor_divide(x, self.celda).astype(np.intp)
+        dentro = (filas >= 0) & (filas < self.filas) & (columnas >= 0) & (columnas < self.columnas)
+        libres = np.ones(np.shape(x), dtype=bool)
+        libres[dentro] = ~self.bloqueadas[filas[dentro], columnas[dentro]]
+        return libres
@@ -1,59 +1,140 @@
 import pygame
+import argparse
+import math
 import sys
 from pygame.locals import *
+from render import DirtyRenderer, RendererGPU
+from recursos import assets, convertir
+from tiempo import PasoFijo
+from perfil import Perfilador, OverlayPerfil
+from audio import AudioEngine, generar_barrido
+from entrada import Entrada
+from nivel import Nivel, Escena
+from camara import Camara
+from arranque import Cronometro, Carga
+from animacion import Animacion, Animador
+import memoria
+import audio
 
 # Constantes de configuración
 WIDTH, HEIGHT = 500, 400
-FPS = 20
+FPS = 60
+# Pasos de simulación por segundo (independiente de los FPS)
+TICKS = 20
+# Fotogramas por segundo de la animación de caminar
+FPS_CAMINA = 20
 BLACK = (0, 0, 0)
-MIN_VOLUME = 0.0
-MAX_VOLUME = 1.0
-VOLUME_STEP = 0.05
+ICON_SIZE = (32, 32)
+NIVEL = 'niveles/pradera.jsonl'
+# La cámara sigue a la oveja intentando dejarla a esta distancia del borde
+# izquierdo de la pantalla, y recorre en cada paso esta fracción de lo que
+# le falta (así se queda un poco atrás cuando la oveja acelera)
+POSICION_JUGADOR = 120
+SUAVIZADO_CAMARA = 0.25
+# Imágenes que se leen en el hilo de carga, con el tamaño al que se dibujan
+IMAGENES = [
+    'imagenes/oveja1.png', 'imagenes/oveja2.png', 'imagenes/oveja3.png',
+    'imagenes/oveja4.png', 'imagenes/oveja5.png', 'imagenes/oveja6.png',
+    ('imagenes/sonido.png', ICON_SIZE), ('imagenes/mute.png', ICON_SIZE),
+]
 
 class SoundManager:
-    def __init__(self, music_path, sonido_img, mute_img, icon_position):
-        # Cargar música de fondo
+    __slots__ = ('audio', 'sonido', 'mute', 'icon_position')
+
+    def __init__(self, audio_engine, sonido_img, mute_img, icon_position):
+        # Música de fondo (se lee del disco a trozos) y efectos, ya cargados
+        self.audio = audio_engine
+
+        # Cargar iconos de sonido ya escalados a su tamaño en pantalla
         try:
-            pygame.mixer.music.load(music_path)
-            pygame.mixer.music.play(-1)
-            pygame.mixer.music.set_volume(0.5)  # Volumen inicial
+            self.sonido = assets.imagen(sonido_img, ICON_SIZE)
+            self.mute = assets.imagen(mute_img, ICON_SIZE)
         except pygame.error as e:
-            print(f"Error al cargar la música: {e}")
+            print(f"Error al cargar los iconos de sonido: {e}")
             pygame.quit()
             sys.exit()
 
         self.icon_position = icon_position
 
-  
+    # Los cambios de volumen no bloquean: el motor los aplica con un fundido
+    def increase_volume(self):
+        self.audio.increase_volume()
+
+    def decrease_volume(self):
+        self.audio.decrease_volume()
+
+    def mute_sound(self):
+        self.audio.mute_sound()
+
+    def unmute_sound(self):
+        self.audio.unmute_sound()
+
+    def play(self, nombre, prioridad=0):
+        return self.audio.play(nombre, prioridad)
+
+    def update(self, dt):
+        self.audio.update(dt)
+
+    def draw(self, renderer):
+        if self.audio.get_volume() > 0:
+            return renderer.blit(self.sonido, self.icon_position)
+        return renderer.blit(self.mute, self.icon_position)
+
 
 class Player:
-    def __init__(self, images, position, velocidad, pantalla_width):
-        self.quieto = images['quieto']
-        self.camina = images['camina']
+    __slots__ = ('animador', 'pos_x', 'pos_y', 'prev_x', 'prev_y', 'velocidad', 'izquierda',
+                 'derecha', 'salto', 'cuentaSalto', 'ancho', 'pantalla_width')
+
+    def __init__(self, animaciones, position, velocidad, pantalla_width):
+        # Animaciones compartidas; el jugador solo guarda en cuál está
+        self.animador = Animador(animaciones, 'quieto')
         self.pos_x, self.pos_y = position
+        # Posición en el paso anterior, para interpolar al dibujar
+        self.prev_x, self.prev_y = position
         self.velocidad = velocidad
         self.izquierda = False
         self.derecha = False
         self.salto = False
         self.cuentaSalto = 10
-        self.cuentaPasos = 0
         self.ancho = 40
         self.pantalla_width = pantalla_width
 
-    def handle_movement(self, keys):
+    # image, rect y mask siguen la interfaz de pygame.sprite, así el jugador
+    # sirve para pygame.sprite.collide_mask y colisiones.SpatialHash
+    @property
+    def image(self):
+        return self.animador.image
+
+    @property
+    def mask(self):
+        return self.animador.mask
+
+    @property
+    def rect(self):
+        return self.image.get_rect(topleft=(int(self.pos_x), int(self.pos_y)))
+
+    def handle_movement(self, keys, dt, avance=0.0, vista_x=0.0):
+        """
+        Un paso de simulación. La posición es del mundo: la oveja corre sola
+        avance píxeles por paso y las teclas la mueven a partir de ahí, sin
+        salirse de la pantalla, que empieza en vista_x.
+        """
+        self.prev_x, self.prev_y = self.pos_x, self.pos_y
+        self.pos_x += avance
+        x = self.pos_x - vista_x
+
         # Movimientos horizontales
-        if keys[K_a] and self.pos_x > self.velocidad:
+        if keys[K_a] and x > self.velocidad:
             self.pos_x -= self.velocidad
             self.izquierda = True
             self.derecha = False
-        elif keys[K_d] and self.pos_x < self.pantalla_width - self.velocidad - self.ancho:
+        elif keys[K_d] and x < self.pantalla_width - self.velocidad - self.ancho:
             self.pos_x += self.velocidad
             self.izquierda = False
             self.derecha = True
         else:
             self.izquierda = False
             self.derecha = False
-            self.cuentaPasos = 0
 
         # Movimientos verticales
         if keys[K_w] and self.pos_y > 100:
@@ -67,7 +148,6 @@ class Player:
                 self.salto = True
                 self.izquierda = False
                 self.derecha = False
-                self.cuentaPasos = 0
         else:
             if self.cuentaSalto >= -10:
                 self.pos_y -= (self.cuentaSalto * abs(self.cuentaSalto)) * 0.5
@@ -76,51 +156,184 @@ class Player:
                 self.cuentaSalto = 10
                 self.salto = False
 
-    def update(self, pantalla, fondo_width, fondo_velocity):
-        # Animación del fondo
-        fondo_x_relativa = fondo_velocity.x % fondo_width
-        pantalla.blit(fondo_velocity.fondo, (fondo_x_relativa - fondo_width, 0))
-        if fondo_x_relativa < WIDTH:
-            pantalla.blit(fondo_velocity.fondo, (fondo_x_relativa, 0))
-        fondo_velocity.x -= fondo_velocity.speed
-
-        # Animación del personaje
-        if self.cuentaPasos >= len(self.camina):
-            self.cuentaPasos = 0
-
-        if self.izquierda or self.derecha or self.salto:
-            pantalla.blit(self.camina[self.cuentaPasos], (int(self.pos_x), int(self.pos_y)))
-            self.cuentaPasos += 1
+        # Animación según el estado; al pararse sigue mirando hacia donde iba
+        if self.salto:
+            self.animador.cambiar('salto' if self.cuentaSalto > 0 else 'cae')
+        elif self.izquierda or self.derecha:
+            self.animador.cambiar('camina')
         else:
-            pantalla.blit(self.quieto, (int(self.pos_x), int(self.pos_y)))
+            self.animador.cambiar('quieto')
+        if self.izquierda or self.derecha:
+            self.animador.izquierda = self.izquierda
+        self.animador.update(dt)
+
+    def update(self, renderer, camara, alpha=1.0):
+        # Interpolar entre el paso anterior y el actual y pasar a la pantalla
+        x = self.prev_x + (self.pos_x - self.prev_x) * alpha
+        y = self.prev_y + (self.pos_y - self.prev_y) * alpha
+        return renderer.blit(self.image, camara.a_pantalla(x, y))
+
+
+class CapaParallax:
+    """
+    Una capa del fondo, repetida en horizontal en una tira ancha que se
+    prepara una sola vez. Cualquier ventana de WIDTH píxeles del mosaico cabe
+    en la tira, así que cada frame la capa se dibuja con un único blit.
+    """
+    __slots__ = ('factor', 'y', 'ancho_tile', 'tira', 'offset')
+
+    def __init__(self, imagen, factor=1.0, y=0):
+        self.factor = factor
+        self.y = y
+        self.ancho_tile = imagen.get_width()
+        repeticiones = -(-(WIDTH + self.ancho_tile) // self.ancho_tile)
+        alpha = imagen.get_flags() & pygame.SRCALPHA
+        tira = pygame.Surface((self.ancho_tile * repeticiones, imagen.get_height()),
+                              pygame.SRCALPHA if alpha else 0)
+        for i in range(repeticiones):
+            tira.blit(imagen, (i * self.ancho_tile, 0))
+        self.tira = convertir(tira, alpha)
+        # Desplazamiento en píxeles dentro de la tira del frame actual
+        self.offset = 0
+
+    def fusionar(self, otra):
+        """
+        Pinta otra capa encima de esta si se mueven a la misma velocidad y cabe
+        dentro; así dos capas cuestan un solo blit. Devuelve True si se ha podido.
+        """
+        if (otra.factor != self.factor or otra.ancho_tile != self.ancho_tile
+                or otra.y < self.y
+                or otra.y + otra.tira.get_height() > self.y + self.tira.get_height()):
+            return False
+        self.tira.blit(otra.tira, (0, otra.y - self.y))
+        return True
+
+    def colocar(self, x):
+        """
+        Calcula el desplazamiento para la posición x del fondo (puede tener
+        decimales). Devuelve True si cambia en pantalla.
+        """
+        offset = math.floor(0.5 - x * self.factor) % self.ancho_tile
+        movido = offset != self.offset
+        self.offset = offset
+        return movido
+
+    def draw(self, pantalla, area=None):
+        if area is None:
+            pantalla.blit(self.tira, (0, self.y), (self.offset, 0, WIDTH, self.tira.get_height()))
+        else:
+            pantalla.blit(self.tira, area.topleft, area.move(self.offset, -self.y))
 
 
 class Fondo:
-    def __init__(self, image_path, velocidad):
+    """
+    Fondo con desplazamiento en paralaje. capas es una lista de
+    (ruta, factor, y), de la más lejana a la más cercana; factor multiplica la
+    velocidad del fondo (1 = se mueve con el suelo). Sin capas se usa solo la
+    imagen principal. El fondo se coloca según la x de la cámara, que puede
+    tener decimales; velocidad es lo que avanza la oveja sola en cada paso.
+    """
+    __slots__ = ('fondo', 'capas', 'speed')
+
+    def __init__(self, image_path, velocidad, capas=None):
         try:
-            self.fondo = pygame.image.load(image_path).convert()
+            self.fondo = assets.imagen(image_path, alpha=False)
+            self.capas = [CapaParallax(self.fondo)]
+            for path, factor, y in capas or ():
+                capa = CapaParallax(assets.imagen(path), factor, y)
+                # Las capas seguidas que se mueven igual se juntan en una sola tira
+                if not self.capas[-1].fusionar(capa):
+                    self.capas.append(capa)
         except pygame.error as e:
             print(f"Error al cargar el fondo: {e}")
             pygame.quit()
             sys.exit()
-        self.x = 0
         self.speed = velocidad
 
+    def draw(self, pantalla, area=None):
+        """
+        Dibuja todas las capas; con area solo se repinta ese rectángulo.
+        """
+        for capa in self.capas:
+            capa.draw(pantalla, area)
+
+    def colocar(self, camara_x):
+        """
+        Coloca las capas para la cámara en camara_x. Devuelve True si el fondo
+        ha cambiado en pantalla.
+        """
+        movido = False
+        for capa in self.capas:
+            movido = capa.colocar(-camara_x) or movido
+        return movido
+
 class Game:
-    def __init__(self):
-        # Inicialización de Pygame
-        pygame.init()
+    def __init__(self, traza=None, nivel=NIVEL, informe_arranque=False, gpu=False,
+                 escalado='lineal'):
+        # Arranque por etapas: primero solo la ventana y una pantalla de carga;
+        # la música, las imágenes y el nivel se cargan en otro hilo mientras
+        # tanto, y al final se monta el juego con lo cargado
+        self.cronometro = Cronometro()
+        self.informe_arranque = informe_arranque
+        self.ejecuta = True
 
-        # Configuración de la pantalla
-        self.pantalla = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Ovejita")
+        # Solo se inicializan los módulos que se usan (pygame.init() arrancaría
+        # también joystick, etc.); el mezclador lo inicia el hilo de carga
+        audio.preinit()
+        pygame.display.init()
+
+        # Medición de tiempos por sección: F3 muestra el overlay; con traza se
+        # mide desde el principio y se exporta a ese archivo al salir
+        self.traza = traza
+        self.perfilador = Perfilador(activo=traza is not None)
+        self.overlay = OverlayPerfil(self.perfilador, extra=self.lineas_overlay)
+
+        # Configuración de la pantalla: con gpu se dibuja con texturas de SDL2
+        # si se puede y, si no, con superficies y zonas sucias
+        self.gpu = RendererGPU.crear("Ovejita", (WIDTH, HEIGHT), escalado) if gpu else None
+        if self.gpu is None:
+            self.pantalla = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Ovejita")
+        else:
+            self.pantalla = self.gpu.pantalla
+        try:
+            self.icono = assets.imagen("imagenes/oveja.png", ICON_SIZE)
+            if self.gpu is None:
+                pygame.display.set_icon(self.icono)
+            else:
+                self.gpu.set_icon(self.icono)
+        except pygame.error as e:
+            print(f"Error al cargar imágenes: {e}")
+            pygame.quit()
+            sys.exit()
+        self.cronometro.marcar('ventana')
 
         # Configuración del reloj para controlar FPS
         self.clock = pygame.time.Clock()
+        # La simulación avanza a TICKS pasos por segundo sean cuales sean los FPS
+        self.paso = PasoFijo(1.0 / TICKS)
+
+        # El fondo hace falta ya: es la pantalla de carga
+        self.fondo = Fondo("imagenes/fondo.png", velocidad=5)
+
+        # Solo se envían a la pantalla las zonas que cambian (con texturas se
+        # dibuja todo cada frame)
+        self.renderer = self.gpu or DirtyRenderer(self.pantalla, self.fondo.draw)
+        self.mostrar_carga(0.0)
+        self.cronometro.marcar('primer frame')
+
+        self.carga = Carga([
+            ('el nivel', lambda: Nivel(nivel)),
+            ('las imágenes', self.decodificar_imagenes),
+            ('la música', self.crear_audio),
+        ])
+        self.carga.empezar()
+        self.esperar_carga()
+        self.cronometro.marcar('carga')
 
         # Cargar y configurar música y sonido
         self.sound_manager = SoundManager(
-            music_path='sonido.ogg',
+            self.carga.resultados['la música'],
             sonido_img='imagenes/sonido.png',
             mute_img='imagenes/mute.png',
             icon_position=(450, 25)
@@ -129,18 +342,85 @@ class Game:
         # Cargar imágenes y configurarlas
         self.load_images()
 
-        # Crear instancias de fondo y jugador
-        self.fondo = Fondo("imagenes/fondo.png", velocidad=5)
+        # Crear la instancia del jugador
         self.player = Player(
-            images={
-                'quieto': self.quieto,
-                'camina': self.camina
-            },
-            position=(50, 200),
+            self.animaciones,
+            position=(POSICION_JUGADOR, 200),
             velocidad=10,
             pantalla_width=WIDTH
         )
 
+        # La cámara sigue a la oveja por el mundo (ver step())
+        self.camara = Camara(WIDTH, HEIGHT)
+
+        # Objetos del nivel: solo se cargan los trozos cercanos a la cámara
+        self.nivel = self.carga.resultados['el nivel']
+        try:
+            self.escena = Escena(self.nivel, WIDTH)
+        except (OSError, ValueError, pygame.error) as e:
+            print(f"Error al cargar el nivel: {e}")
+            pygame.quit()
+            sys.exit()
+        self.escena.actualizar(self.camara.x)
+
+        # Ya existen todas las variantes; los archivos decodificados sobran
+        assets.descartar_originales()
+
+        # Tabla de teclas -> acciones; el resto de eventos no llega a la cola
+        self.entrada = Entrada()
+        self.entrada.asignar(pygame.K_9, 'bajar_volumen', self.sound_manager.decrease_volume)
+        self.entrada.asignar(pygame.K_0, 'subir_volumen', self.sound_manager.increase_volume)
+        self.entrada.asignar(pygame.K_m, 'silenciar', self.sound_manager.mute_sound)
+        self.entrada.asignar(pygame.K_COMMA, 'activar_sonido', self.sound_manager.unmute_sound)
+        self.entrada.asignar(pygame.K_F3, 'perfil', self.overlay.alternar)
+        # Si la ventana estuvo tapada hay que volver a pintarla entera
+        self.entrada.al_evento(pygame.WINDOWEXPOSED, self.renderer.invalidar)
+        self.entrada.filtrar()
+        # El primer frame de juego tapa entera la pantalla de carga
+        self.renderer.invalidar()
+        self.cronometro.marcar('listo')
+
+    def decodificar_imagenes(self):
+        # Se leen los archivos; convertirlas al formato de la pantalla se
+        # hace después en el hilo principal
+        tipos = self.carga.resultados['el nivel'].tipos
+        assets.decodificar(IMAGENES + [(tipo['imagen'], tuple(tipo['tamano']) if tipo.get('tamano') else None)
+                                       for tipo in tipos.values()])
+
+    def crear_audio(self):
+        pygame.mixer.init()
+        engine = AudioEngine('sonido.ogg', volumen=0.5)  # Volumen inicial
+        engine.cargar_sfx('salto', generar_barrido(300, 700, 0.15))
+        return engine
+
+    def mostrar_carga(self, progreso):
+        """
+        Pantalla de carga: el fondo con una barra de progreso.
+        """
+        self.renderer.invalidar()
+        self.fondo.draw(self.pantalla)
+        barra = pygame.Rect(WIDTH // 4, HEIGHT - 40, WIDTH // 2, 12)
+        self.pantalla.fill(BLACK, barra)
+        relleno = barra.inflate(-4, -4)
+        relleno.width = int(relleno.width * progreso)
+        self.pantalla.fill((255, 255, 255), relleno)
+        self.renderer.presentar()
+
+    def esperar_carga(self):
+        """
+        Mantiene la ventana viva mientras el otro hilo carga.
+        """
+        while not self.carga.terminada():
+            if pygame.event.get(pygame.QUIT):
+                self.ejecuta = False
+            self.mostrar_carga(self.carga.progreso)
+            self.carga.esperar(1.0 / FPS)
+        if self.carga.error is not None:
+            etiqueta, e = self.carga.error
+            print(f"Error al cargar {etiqueta}: {e}")
+            pygame.quit()
+            sys.exit()
+
     def update(self):
         self.player.y+=10
         if self.player.top>400:
@@ -155,61 +435,135 @@ class Game:
     def load_images(self):
         # Cargar imágenes necesarias
         try:
-            self.icono = pygame.image.load("imagenes/oveja.png").convert_alpha()
-            pygame.display.set_icon(self.icono)
-
-            self.quieto = pygame.image.load('imagenes/oveja1.png').convert_alpha()
-            camina_images = [
-                pygame.image.load('imagenes/oveja2.png').convert_alpha(),
-                pygame.image.load('imagenes/oveja3.png').convert_alpha(),
-                pygame.image.load('imagenes/oveja4.png').convert_alpha(),
-                pygame.image.load('imagenes/oveja5.png').convert_alpha(),
-                pygame.image.load('imagenes/oveja5.png').convert_alpha()
-            ]
-            self.camina = camina_images
+            oveja = [assets.imagen(f'imagenes/oveja{i}.png') for i in range(1, 7)]
+            # Animaciones de la oveja por estado (las versiones que miran a
+            # la izquierda se preparan aquí, una vez)
+            self.animaciones = {
+                'quieto': Animacion(oveja[:1]),
+                'camina': Animacion(oveja[1:6], fps=FPS_CAMINA),
+                'salto': Animacion(oveja[2:4], fps=FPS_CAMINA // 2, bucle=False),
+                'cae': Animacion(oveja[4:5]),
+            }
         except pygame.error as e:
             print(f"Error al cargar imágenes: {e}")
             pygame.quit()
             sys.exit()
 
         
+    def handle_events(self):
+        # Manejo de eventos: acciones según la tabla de teclas
+        self.entrada.procesar()
+        if self.entrada.salir:
+            self.ejecuta = False
+
+    def lineas_entrada(self):
+        metricas = self.entrada.metricas()
+        if metricas is None:
+            return []
+        return [f"entrada media {metricas['media_ms']:.1f} ms  máx {metricas['max_ms']:.1f} ms"]
+
+    def informe_memoria(self):
+        return memoria.informe({'jugador': [self.player], 'objetos': self.escena},
+                               {'fondo (tiras)': [capa.tira for capa in self.fondo.capas]})
+
+    def lineas_overlay(self):
+        return self.lineas_entrada() + memoria.lineas(self.informe_memoria())
+
+    def step(self, keys):
+        # Un paso de simulación: jugador, cámara y objetos del nivel. El
+        # juego es de correr a propósito: la oveja avanza sola a la velocidad
+        # del fondo aunque no se pulse nada, y la cámara no avanza por su
+        # cuenta sino que la sigue a ella (en horizontal; en vertical el
+        # mundo mide lo que la pantalla)
+        saltando = self.player.salto
+        self.player.handle_movement(keys, self.paso.paso, self.fondo.speed, self.camara.x)
+        if self.player.salto and not saltando:
+            self.sound_manager.play('salto')
+        self.camara.seguir(self.player.pos_x - POSICION_JUGADOR + WIDTH / 2, HEIGHT / 2,
+                           SUAVIZADO_CAMARA)
+        self.escena.update(self.camara.rect)
+        self.escena.actualizar(self.camara.x)
+
+    def draw(self, alpha=1.0):
+        perfil = self.perfilador
+        # Si el fondo se ha movido se repinta entero; si no, solo se borra el frame anterior
+        with perfil.seccion('fondo'):
+            self.camara.interpolar(alpha)
+            if self.fondo.colocar(self.camara.x_dibujo):
+                self.renderer.invalidar()
+            if self.renderer.completo:
+                self.fondo.draw(self.pantalla)
+                self.renderer.blits += len(self.fondo.capas)
+            else:
+                self.renderer.limpiar()
+
+        with perfil.seccion('escena'):
+            self.escena.draw(self.renderer, self.camara, alpha)
+
+        # Dibujar jugador y elementos de UI (icono de sonido/mute)
+        with perfil.seccion('jugador'):
+            self.player.update(self.renderer, self.camara, alpha)
+        with perfil.seccion('SoundManager.draw'):
+            self.sound_manager.draw(self.renderer)
+        self.overlay.draw(self.renderer)
+
     def run(self):
         # Bucle principal del juego
-        ejecuta = True
-        while ejecuta:
+        while self.ejecuta:
             # Controlar FPS
-            self.clock.tick(FPS)
-
-            # Manejo de eventos
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    ejecuta = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_9:
-                        self.sound_manager.decrease_volume()
-                    elif event.key == pygame.K_0:
-                        self.sound_manager.increase_volume()
-                    elif event.key == pygame.K_m:
-                        self.sound_manager.mute_sound()
-                    elif event.key == pygame.K_COMMA:
-                        self.sound_manager.unmute_sound()
-
-            # Obtener el estado de las teclas
-            keys = pygame.key.get_pressed()
-
-            # Actualizar movimientos del jugador
-            self.player.handle_movement(keys)
-
-            # Actualizar y dibujar fondo y jugador
-            self.player.update(self.pantalla, self.fondo.fondo.get_rect().width, self.fondo)
-
-            # Actualizar la pantalla
-            pygame.display.update()
+            dt = self.clock.tick(FPS) / 1000.0
+            perfil = self.perfilador
+            perfil.inicio_frame()
+
+            with perfil.seccion('eventos'):
+                self.handle_events()
+
+                # Obtener el estado de las teclas
+                mantenidas = pygame.key.get_pressed()
+
+            # Simular los pasos fijos que correspondan al tiempo transcurrido;
+            # las pulsaciones del buffer las ve el primer paso que se ejecute
+            with perfil.seccion('handle_movement'):
+                for _ in range(self.paso.consumir(dt)):
+                    self.step(self.entrada.estado(mantenidas))
+                    self.entrada.consumir()
+            self.sound_manager.update(dt)
+
+            # Si vamos atrasados se salta el dibujado, no la simulación
+            if not self.paso.debe_dibujar():
+                perfil.fin_frame(0, 1 + len(self.escena))
+                continue
+            self.draw(self.paso.alpha)
+
+            # Actualizar solo las zonas de la pantalla que han cambiado
+            with perfil.seccion('display.update'):
+                self.renderer.presentar()
+            if self.informe_arranque:
+                self.cronometro.marcar('primer frame de juego')
+                print(self.cronometro.informe())
+                self.informe_arranque = False
+            perfil.fin_frame(self.renderer.blits_frame, 1 + len(self.escena))
 
         # Salida del juego
+        if self.traza:
+            self.perfilador.exportar(self.traza)
+        self.nivel.cerrar()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Ovejita")
+    parser.add_argument('--traza', metavar='ARCHIVO',
+                        help="medir cada frame y exportar la traza al salir (.json de Chrome o .csv)")
+    parser.add_argument('--nivel', default=NIVEL,
+                        help="archivo de nivel (ver nivel.py)")
+    parser.add_argument('--arranque', action='store_true',
+                        help="mostrar cuánto tarda cada etapa del arranque")
+    parser.add_argument('--gpu', action='store_true',
+                        help="dibujar con texturas de SDL2 (si no se puede, por software)")
+    parser.add_argument('--escalado', choices=('lineal', 'cercano'), default='lineal',
+                        help="filtro al escalar la ventana con --gpu")
+    args = parser.parse_args()
+    game = Game(traza=args.traza, nivel=args.nivel, informe_arranque=args.arranque,
+                gpu=args.gpu, escalado=args.escalado)
     game.run()
@@ -5,12 +5,14 @@ a = Analysis(
     ['juego.py'],
     pathex=[],
     binaries=[],
-    datas=[('imagenes', 'imagenes')],
+    datas=[('imagenes', 'imagenes'), ('niveles', 'niveles')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # juego no usa NumPy ni pkg_resources (pygame los importa si están):
+    # sin ellos el ejecutable es más pequeño y arranca antes
+    excludes=['numpy', 'pkg_resources', 'setuptools'],
     noarchive=False,
     optimize=0,
 )
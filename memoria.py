@@ -0,0 +1,170 @@
+"""
+Informe de memoria: superficies por imagen, entidades y memoria residente.
+
+    python memoria.py juego
+    python memoria.py prueba --enemigos 100 1000 5000
+
+Con prueba y varios números de enemigos se ve cómo crece la memoria con
+ellos: las imágenes y máscaras son compartidas, así que cada enemigo solo
+debería añadir su propio objeto (bytes por entidad). En juego.py el overlay
+de F3 muestra un resumen.
+"""
+import argparse
+import os
+import sys
+
+import pygame
+
+from recursos import assets, bytes_superficie
+
+
+def memoria_residente():
+    """
+    Memoria residente del proceso en bytes, o None si el sistema no la da.
+    """
+    try:
+        with open('/proc/self/statm') as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Solo el máximo alcanzado (en KB en Linux, en bytes en macOS)
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo if sys.platform == 'darwin' else maximo * 1024
+
+
+def _atributos(objeto):
+    valores = list(getattr(objeto, '__dict__', {}).values())
+    for clase in type(objeto).__mro__:
+        for nombre in getattr(clase, '__slots__', ()):
+            if hasattr(objeto, nombre):
+                valores.append(getattr(objeto, nombre))
+    return valores
+
+
+def bytes_objeto(objeto):
+    """
+    Memoria propia de una entidad: la instancia, su __dict__ si lo tiene y
+    los rects y contenedores que son solo suyos. No cuenta las imágenes ni
+    las máscaras, que se comparten. Es una cota superior: desde Python 3.11
+    el __dict__ no existe como objeto aparte hasta que alguien lo pide.
+    """
+    total = sys.getsizeof(objeto)
+    if hasattr(objeto, '__dict__'):
+        total += sys.getsizeof(objeto.__dict__)
+    for valor in _atributos(objeto):
+        if isinstance(valor, (pygame.Rect, set, list, dict)):
+            total += sys.getsizeof(valor)
+    return total
+
+
+def informe(entidades=(), superficies=None, cache=assets):
+    """
+    entidades es un diccionario nombre -> colección de entidades (o un
+    iterable de pares). Las entidades de cada grupo se suponen del mismo
+    tipo, así que se mide solo la primera. superficies (nombre -> lista de
+    superficies) añade las que no salen de la caché de recursos.
+    """
+    grupos = {}
+    for nombre, coleccion in dict(entidades).items():
+        n = len(coleccion)
+        muestra = next(iter(coleccion), None)
+        grupos[nombre] = {
+            'cantidad': n,
+            'bytes_por_entidad': bytes_objeto(muestra) if muestra is not None else 0,
+        }
+    por_imagen = cache.memoria()
+    for nombre, lista in (superficies or {}).items():
+        por_imagen[nombre] = sum(bytes_superficie(superficie) for superficie in lista)
+    return {
+        'residente': memoria_residente(),
+        'superficies': por_imagen,
+        'bytes_superficies': sum(por_imagen.values()),
+        'entidades': grupos,
+    }
+
+
+def lineas(datos):
+    """
+    Resumen en pocas líneas, para el overlay.
+    """
+    residente = datos['residente']
+    texto = [f"memoria {residente / 2 ** 20:.1f} MB" if residente is not None else "memoria ?",
+             f"superficies {datos['bytes_superficies'] / 2 ** 20:.2f} MB "
+             f"({len(datos['superficies'])} imágenes)"]
+    for nombre, grupo in datos['entidades'].items():
+        texto.append(f"{nombre} {grupo['cantidad']} x {grupo['bytes_por_entidad']} B")
+    return texto
+
+
+def imprimir(datos, titulo):
+    print(titulo)
+    residente = datos['residente']
+    if residente is not None:
+        print(f"    memoria residente: {residente / 2 ** 20:.1f} MB")
+    print(f"    superficies: {datos['bytes_superficies'] / 1024:.1f} KB")
+    for path, n in sorted(datos['superficies'].items(), key=lambda item: -item[1]):
+        print(f"        {path:<26}{n / 1024:9.1f} KB")
+    for nombre, grupo in datos['entidades'].items():
+        total = grupo['cantidad'] * grupo['bytes_por_entidad']
+        print(f"    {nombre}: {grupo['cantidad']} x {grupo['bytes_por_entidad']} B "
+              f"= {total / 1024:.1f} KB")
+
+
+def medir_juego(frames):
+    import juego
+    from benchmark import TeclasScript, guion_demo
+    teclas = TeclasScript(guion_demo())
+    game = juego.Game()
+    for i in range(frames):
+        game.handle_events()
+        game.step(teclas(i))
+        game.draw()
+        game.renderer.presentar()
+    imprimir(game.informe_memoria(), f"juego tras {frames} frames")
+    game.nivel.cerrar()
+
+
+def medir_prueba(enemigos, frames):
+    import prueba
+    from benchmark import Teclas
+    residentes = []
+    for n in enemigos:
+        partida = prueba.Juego(n, semilla=0)
+        for _ in range(frames):
+            partida.eventos()
+            partida.actualizar(Teclas())
+            partida.presentar(partida.dibujar())
+        datos = partida.informe_memoria()
+        imprimir(datos, f"prueba con {n} águilas tras {frames} frames")
+        residentes.append((n, datos['residente']))
+        pygame.quit()
+        assets.vaciar()
+    if len(residentes) > 1 and None not in (r for _, r in residentes):
+        (n0, r0), (n1, r1) = residentes[0], residentes[-1]
+        print(f"De {n0} a {n1} águilas: {(r1 - r0) / 2 ** 20:+.1f} MB residentes, "
+              f"{(r1 - r0) / (n1 - n0):.0f} B por águila")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Informe de memoria de los juegos")
+    parser.add_argument('juego', choices=('juego', 'prueba'))
+    parser.add_argument('--enemigos', type=int, nargs='+', default=[3],
+                        help="águilas de prueba (varios valores para comparar)")
+    parser.add_argument('--frames', type=int, default=120)
+    args = parser.parse_args(argv)
+
+    from benchmark import configurar_headless
+    configurar_headless()
+    if args.juego == 'juego':
+        medir_juego(args.frames)
+    else:
+        medir_prueba(args.enemigos, args.frames)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Niveles de desplazamiento lateral divididos en trozos (chunks).
+
+Un nivel es un archivo JSON Lines: la primera línea es la cabecera y cada
+línea siguiente es un trozo de ancho_chunk píxeles del mundo.
+
+    {"ancho_chunk": 500, "tipos": {"hoyo": {"imagen": "imagenes/hoyo.png",
+        "clase": "peligro", "tamano": [80, 80]}, ...}}
+    [["hoyo", 120, 300], ["aguila", 380, 60]]
+    []
+    ...
+
+Cada objeto de un trozo es [tipo, x, y] con x relativa al inicio del trozo.
+Las clases de objeto son "tile", "peligro", "enemigo" y "premio"; los tipos
+pueden tener además "velocidad" (píxeles por paso hacia la izquierda).
+
+Al abrir el nivel solo se guarda dónde empieza cada línea; los trozos se leen
+del disco cuando la cámara se acerca y se descartan cuando queda atrás, así
+que la memoria no crece con la longitud del nivel. Al llegar al final el
+nivel vuelve a empezar.
+"""
+import json
+import math
+
+from recursos import assets, resource_path
+
+CLASES = ('tile', 'peligro', 'enemigo', 'premio')
+# Píxeles alrededor de la vista en los que los objetos se actualizan a cada paso
+MARGEN_ACTIVO = 64
+
+
+class Nivel:
+    """
+    Archivo de nivel abierto. Lee los trozos bajo demanda.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.archivo = open(resource_path(path), 'rb')
+        self.cabecera = json.loads(self.archivo.readline())
+        self.ancho_chunk = self.cabecera['ancho_chunk']
+        self.tipos = self.cabecera['tipos']
+        for nombre, tipo in self.tipos.items():
+            if tipo.get('clase') not in CLASES:
+                raise ValueError(f"{path}: clase desconocida en el tipo {nombre!r}")
+        # Posición en el archivo de cada trozo
+        self.offsets = []
+        offset = self.archivo.tell()
+        for linea in self.archivo:
+            if linea.strip():
+                self.offsets.append(offset)
+            offset += len(linea)
+        if not self.offsets:
+            raise ValueError(f"{path} no tiene ningún trozo")
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def chunk(self, i):
+        """
+        Lista de (tipo, x, y) del trozo i, con x relativa al trozo. Los
+        índices fuera del nivel dan la vuelta.
+        """
+        self.archivo.seek(self.offsets[i % len(self.offsets)])
+        return json.loads(self.archivo.readline())
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class Objeto:
+    """
+    Un objeto del nivel en coordenadas del mundo.
+    """
+    __slots__ = ('tipo', 'clase', 'image', 'x', 'y', 'x_anterior', 'velocidad')
+
+    def __init__(self, tipo, clase, image, x, y, velocidad=0):
+        self.tipo = tipo
+        self.clase = clase
+        self.image = image
+        self.x = x
+        self.y = y
+        self.x_anterior = x
+        self.velocidad = velocidad
+
+    def update(self, pasos=1):
+        self.x_anterior = self.x
+        self.x -= self.velocidad * pasos
+
+
+class Escena:
+    """
+    Objetos del nivel agrupados por trozo. Solo existen los trozos entre
+    margen trozos por detrás de la cámara y margen por delante de la vista.
+    Los objetos de esos trozos que no se ven no se dibujan y se mueven solo
+    cada ritmo_fuera pasos (avanzando esos pasos de una vez).
+    """
+    def __init__(self, nivel, ancho_vista, margen=1, ritmo_fuera=4):
+        self.nivel = nivel
+        self.ancho_vista = ancho_vista
+        self.margen = margen
+        self.ritmo_fuera = ritmo_fuera
+        self.pasos = 0
+        self.dibujados = 0
+        # Las imágenes de cada tipo se preparan una vez, antes de que
+        # empiece la partida; los trozos solo crean objetos que las comparten
+        self.imagenes = {}
+        for nombre, tipo in nivel.tipos.items():
+            tamano = tipo.get('tamano')
+            self.imagenes[nombre] = assets.imagen(tipo['imagen'], tuple(tamano) if tamano else None)
+        self.chunks = {}
+        self.cargas = 0
+        self.descargas = 0
+        self.max_objetos = 0
+
+    def _cargar(self, i):
+        base = i * self.nivel.ancho_chunk
+        objetos = []
+        for nombre, x, y in self.nivel.chunk(i):
+            tipo = self.nivel.tipos[nombre]
+            objetos.append(Objeto(nombre, tipo['clase'], self.imagenes[nombre],
+                                  base + x, y, tipo.get('velocidad', 0)))
+        self.cargas += 1
+        return objetos
+
+    def actualizar(self, camara_x):
+        """
+        Carga los trozos que se acercan a la vista y descarta los que quedan
+        lejos. camara_x es la x del mundo del borde izquierdo de la pantalla.
+        """
+        ancho = self.nivel.ancho_chunk
+        primero = math.floor(camara_x / ancho) - self.margen
+        ultimo = math.floor((camara_x + self.ancho_vista) / ancho) + self.margen
+        for i in [i for i in self.chunks if i < primero or i > ultimo]:
+            del self.chunks[i]
+            self.descargas += 1
+        for i in range(primero, ultimo + 1):
+            if i not in self.chunks:
+                self.chunks[i] = self._cargar(i)
+        self.max_objetos = max(self.max_objetos, len(self))
+
+    def update(self, vista=None):
+        """
+        Un paso de simulación. vista es la zona del mundo que ve la cámara;
+        sin ella se actualiza todo a cada paso.
+        """
+        self.pasos += 1
+        toca = self.pasos % self.ritmo_fuera == 0
+        cerca = vista.inflate(2 * MARGEN_ACTIVO, 2 * MARGEN_ACTIVO) if vista is not None else None
+        for objetos in self.chunks.values():
+            for objeto in objetos:
+                if not objeto.velocidad:
+                    continue
+                if cerca is None or cerca.colliderect((objeto.x, objeto.y,
+                                                       objeto.image.get_width(),
+                                                       objeto.image.get_height())):
+                    objeto.update()
+                elif toca:
+                    objeto.update(self.ritmo_fuera)
+
+    def __len__(self):
+        return sum(len(objetos) for objetos in self.chunks.values())
+
+    def __iter__(self):
+        for objetos in self.chunks.values():
+            yield from objetos
+
+    def draw(self, renderer, camara, alpha=1.0):
+        """
+        Dibuja los objetos cargados que se ven en la cámara (camara.Camara, ya
+        interpolada para este frame).
+        """
+        dibujados = 0
+        for objeto in self:
+            x = objeto.x_anterior + (objeto.x - objeto.x_anterior) * alpha
+            imagen = objeto.image
+            if not camara.visible((math.floor(x + 0.5), objeto.y,
+                                   imagen.get_width(), imagen.get_height())):
+                continue
+            renderer.blit(imagen, camara.a_pantalla(x, objeto.y))
+            dibujados += 1
+        self.dibujados = dibujados
+
+    def estadisticas(self):
+        return {
+            'chunks': len(self.chunks),
+            'objetos': len(self),
+            'dibujados': self.dibujados,
+            'max_objetos': self.max_objetos,
+            'cargas': self.cargas,
+            'descargas': self.descargas,
+        }
@@ -0,0 +1,196 @@
+"""
+Oleadas de enemigos definidas en una tabla.
+
+La tabla es un archivo JSON Lines con una oleada por línea:
+
+    {"inicio": 5.0, "tipo": "lobo", "cantidad": 20, "intervalo": 0.25, "zona": [500, 150, 100, 120]}
+
+inicio son los segundos de partida en que empieza, y a partir de ahí sale un
+enemigo cada intervalo segundos (todos a la vez con intervalo 0). zona
+(x, y, ancho, alto) es donde puede aparecer la esquina superior izquierda de
+cada uno; sin zona se colocan igual que cuando reaparecen.
+
+El trabajo caro, crear los sprites, se hace por adelantado y repartido
+entre frames: preparar() crea los objetos de las oleadas que van a empezar
+pronto sin pasar de un presupuesto de tiempo por frame y los deja en el pool
+de su tipo. Al empezar la oleada solo hay que sacarlos del pool y colocarlos,
+y aun así se activan como mucho MAX_POR_PASO por paso de simulación.
+
+Qué enemigos aparecen y cuándo depende solo del tiempo de partida, nunca
+del reloj, así que con la misma semilla la partida se repite igual (ver
+repeticion.py) tarde lo que tarde la preparación.
+"""
+import json
+import time
+from collections import deque
+
+from recursos import resource_path
+
+TABLA = 'niveles/oleadas.jsonl'
+# Las oleadas se empiezan a preparar estos segundos antes de su inicio
+ANTICIPACION = 3.0
+# Enemigos que se activan como mucho en cada paso de simulación
+MAX_POR_PASO = 8
+
+
+class Oleada:
+    """
+    Una línea de la tabla.
+    """
+    __slots__ = ('inicio', 'tipo', 'cantidad', 'intervalo', 'zona')
+
+    def __init__(self, inicio, tipo, cantidad, intervalo=0.0, zona=None):
+        if inicio < 0:
+            raise ValueError(f"inicio no puede ser negativo ({inicio!r})")
+        if not isinstance(cantidad, int) or cantidad < 1:
+            raise ValueError(f"cantidad tiene que ser un entero mayor que 0, no {cantidad!r}")
+        if intervalo < 0:
+            raise ValueError(f"intervalo no puede ser negativo ({intervalo!r})")
+        if zona is not None and len(zona) != 4:
+            raise ValueError(f"zona tiene que ser [x, y, ancho, alto], no {zona!r}")
+        self.inicio = inicio
+        self.tipo = tipo
+        self.cantidad = cantidad
+        self.intervalo = intervalo
+        self.zona = zona
+
+    def aparecidos(self, tiempo):
+        """
+        Enemigos de la oleada que ya deberían haber salido a tiempo segundos.
+        """
+        if tiempo < self.inicio:
+            return 0
+        if self.intervalo <= 0:
+            return self.cantidad
+        return min(self.cantidad, int((tiempo - self.inicio) / self.intervalo) + 1)
+
+
+def cargar(path=TABLA, tipos=None):
+    """
+    Lee la tabla. Con tipos (los nombres de enemigo que se saben crear) se
+    comprueba también el tipo de cada oleada. Una línea mal escrita da un
+    ValueError que dice cuál es.
+    """
+    tabla = []
+    with open(resource_path(path), encoding='utf-8') as archivo:
+        for numero, linea in enumerate(archivo, 1):
+            if not linea.strip():
+                continue
+            try:
+                campos = json.loads(linea)
+                if not isinstance(campos, dict):
+                    raise ValueError("no es un objeto JSON")
+                oleada = Oleada(**campos)
+                if tipos is not None and oleada.tipo not in tipos:
+                    raise ValueError(f"tipo de enemigo desconocido {oleada.tipo!r}")
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{path}, línea {numero}: {e}") from None
+            tabla.append(oleada)
+    return tabla
+
+
+class Oleadas:
+    """
+    Lleva la tabla durante la partida. pools es un diccionario tipo -> Pool
+    con los enemigos de cada tipo; cada enemigo tiene un atributo tipo para
+    devolverlo a su pool con liberar(). rng da las posiciones dentro de cada
+    zona (el módulo random o un random.Random).
+    """
+    def __init__(self, tabla, pools, rng, max_por_paso=MAX_POR_PASO):
+        self.tabla = sorted(tabla, key=lambda oleada: oleada.inicio)
+        desconocidos = {oleada.tipo for oleada in self.tabla} - set(pools)
+        if desconocidos:
+            raise ValueError(f"tipos de enemigo desconocidos: {', '.join(sorted(desconocidos))}")
+        self.pools = pools
+        self.rng = rng
+        self.max_por_paso = max_por_paso
+        # Objetos que faltan por crear de cada oleada, en orden de inicio. Los
+        # pools no se vacían al reiniciar, así que esto se hace una sola vez
+        self.por_preparar = deque([oleada, oleada.cantidad] for oleada in self.tabla)
+        self.preparados = 0
+        self.reiniciar()
+
+    def reiniciar(self):
+        """
+        Vuelve al principio de la tabla (los enemigos activos los libera quien
+        los tiene).
+        """
+        self.tiempo = 0.0
+        self.siguiente = 0
+        # [oleada, enemigos que ya han salido]
+        self.activas = []
+
+    @property
+    def terminada(self):
+        return self.siguiente == len(self.tabla) and not self.activas
+
+    def preparar(self, presupuesto=None, hasta=None):
+        """
+        Crea objetos de las oleadas que empiezan antes de hasta segundos de
+        partida (por defecto, en menos de ANTICIPACION) hasta gastar
+        presupuesto segundos; sin presupuesto los crea todos. Devuelve cuántos
+        ha creado.
+        """
+        if hasta is None:
+            hasta = self.tiempo + ANTICIPACION
+        inicio = time.perf_counter()
+        creados = 0
+        while self.por_preparar:
+            pendiente = self.por_preparar[0]
+            oleada = pendiente[0]
+            if oleada.inicio > hasta:
+                break
+            if presupuesto is not None and time.perf_counter() - inicio >= presupuesto:
+                break
+            self.pools[oleada.tipo].ampliar()
+            creados += 1
+            pendiente[1] -= 1
+            if pendiente[1] <= 0:
+                self.por_preparar.popleft()
+        self.preparados += creados
+        return creados
+
+    def update(self, dt, grupo):
+        """
+        Avanza dt segundos de partida y añade a grupo los enemigos que tocan.
+        Si en un paso tocan más de max_por_paso, el resto sale en los
+        siguientes. Devuelve cuántos han salido.
+        """
+        self.tiempo += dt
+        while self.siguiente < len(self.tabla) and self.tabla[self.siguiente].inicio <= self.tiempo:
+            self.activas.append([self.tabla[self.siguiente], 0])
+            self.siguiente += 1
+
+        cupo = self.max_por_paso
+        for activa in self.activas:
+            oleada, aparecidos = activa
+            n = min(oleada.aparecidos(self.tiempo) - aparecidos, cupo)
+            for _ in range(n):
+                grupo.add(self.aparecer(oleada))
+            activa[1] += n
+            cupo -= n
+            if not cupo:
+                break
+        salidos = self.max_por_paso - cupo
+        self.activas = [activa for activa in self.activas if activa[1] < activa[0].cantidad]
+        return salidos
+
+    def aparecer(self, oleada):
+        enemigo = self.pools[oleada.tipo].adquirir()
+        if oleada.zona is not None:
+            x, y, ancho, alto = oleada.zona
+            enemigo.rect.topleft = (self.rng.randint(x, x + ancho), self.rng.randint(y, y + alto))
+        return enemigo
+
+    def liberar(self, enemigo):
+        self.pools[enemigo.tipo].liberar(enemigo)
+
+    def estadisticas(self):
+        return {
+            'tiempo': round(self.tiempo, 2),
+            'activas': len(self.activas),
+            'por_empezar': len(self.tabla) - self.siguiente,
+            'preparados': self.preparados,
+            'por_preparar': sum(pendiente[1] for pendiente in self.por_preparar),
+            'pools': {tipo: pool.estadisticas() for tipo, pool in self.pools.items()},
+        }
@@ -0,0 +1,178 @@
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+
+class _Seccion:
+    __slots__ = ('perfilador', 'nombre', 'inicio')
+
+    def __init__(self, perfilador, nombre):
+        self.perfilador = perfilador
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.perfilador.secciones.append((self.nombre, self.inicio, time.perf_counter() - self.inicio))
+
+
+class _SinMedir:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_SIN_MEDIR = _SinMedir()
+
+
+class Perfilador:
+    """
+    Mide cuánto tarda cada sección del frame y guarda los últimos frames.
+
+    Desactivado, seccion() devuelve siempre el mismo objeto que no hace nada,
+    así que el coste es el de una llamada. Los frames guardados se pueden
+    exportar como traza de Chrome (chrome://tracing, Perfetto) o como CSV.
+    """
+    def __init__(self, activo=False, max_frames=3600):
+        self.activo = activo
+        # Si se pidió al crearlo (p. ej. para exportar una traza) sigue
+        # midiendo aunque se oculte el overlay
+        self.siempre = activo
+        self.frames = deque(maxlen=max_frames)
+        self.secciones = []
+        self._inicio_frame = None
+
+    def seccion(self, nombre):
+        if not self.activo:
+            return _SIN_MEDIR
+        return _Seccion(self, nombre)
+
+    def inicio_frame(self):
+        if self.activo:
+            self._inicio_frame = time.perf_counter()
+            self.secciones = []
+
+    def fin_frame(self, blits=0, entidades=0):
+        if not self.activo or self._inicio_frame is None:
+            return
+        duracion = time.perf_counter() - self._inicio_frame
+        self.frames.append((self._inicio_frame, duracion, self.secciones, blits, entidades))
+        self._inicio_frame = None
+
+    def resumen(self, ultimos=120):
+        """
+        FPS, percentiles 50/99 del tiempo de frame (ms), blits y entidades de
+        los últimos frames.
+        """
+        frames = list(self.frames)[-ultimos:]
+        if not frames:
+            return None
+        duraciones = sorted(f[1] for f in frames)
+        n = len(duraciones)
+        transcurrido = frames[-1][0] + frames[-1][1] - frames[0][0]
+        return {
+            'fps': n / transcurrido if transcurrido > 0 else 0.0,
+            'p50_ms': duraciones[n // 2] * 1000,
+            'p99_ms': duraciones[min(n - 1, int(n * 0.99))] * 1000,
+            'blits': frames[-1][3],
+            'entidades': frames[-1][4],
+        }
+
+    def exportar(self, path):
+        """
+        Guarda los frames medidos. Con extensión .csv una fila por sección;
+        con cualquier otra, traza JSON de Chrome.
+        """
+        if path.endswith('.csv'):
+            self._exportar_csv(path)
+        else:
+            self._exportar_chrome(path)
+
+    def _exportar_csv(self, path):
+        with open(path, 'w', newline='') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(['frame', 'seccion', 'inicio_ms', 'duracion_ms', 'blits', 'entidades'])
+            if not self.frames:
+                return
+            origen = self.frames[0][0]
+            for i, (inicio, duracion, secciones, blits, entidades) in enumerate(self.frames):
+                escritor.writerow([i, 'frame', f"{(inicio - origen) * 1000:.3f}",
+                                   f"{duracion * 1000:.3f}", blits, entidades])
+                for nombre, inicio_s, duracion_s in secciones:
+                    escritor.writerow([i, nombre, f"{(inicio_s - origen) * 1000:.3f}",
+                                       f"{duracion_s * 1000:.3f}", '', ''])
+
+    def _exportar_chrome(self, path):
+        eventos = []
+        origen = self.frames[0][0] if self.frames else 0.0
+        for i, (inicio, duracion, secciones, blits, entidades) in enumerate(self.frames):
+            eventos.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                            'ts': (inicio - origen) * 1e6, 'dur': duracion * 1e6,
+                            'args': {'frame': i, 'blits': blits, 'entidades': entidades}})
+            for nombre, inicio_s, duracion_s in secciones:
+                eventos.append({'name': nombre, 'ph': 'X', 'pid': 1, 'tid': 1,
+                                'ts': (inicio_s - origen) * 1e6, 'dur': duracion_s * 1e6})
+        with open(path, 'w') as archivo:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, archivo)
+
+
+class OverlayPerfil:
+    """
+    Texto con las medidas del perfilador en una esquina de la pantalla. El
+    texto se vuelve a generar solo cada cierto tiempo, no en cada frame.
+    """
+    def __init__(self, perfilador, posicion=(5, 5), refresco=0.25, extra=None):
+        self.perfilador = perfilador
+        # Función opcional que devuelve más líneas de texto para mostrar
+        self.extra = extra
+        self.posicion = posicion
+        self.refresco = refresco
+        self.visible = False
+        self._fuente = None
+        self._superficie = None
+        self._ultimo = 0.0
+
+    def alternar(self):
+        self.visible = not self.visible
+        self.perfilador.activo = self.visible or self.perfilador.siempre
+
+    def _generar(self):
+        if self._fuente is None:
+            pygame.font.init()
+            self._fuente = pygame.font.Font(None, 18)
+        datos = self.perfilador.resumen()
+        if datos is None:
+            lineas = ["midiendo..."]
+        else:
+            lineas = [
+                f"FPS {datos['fps']:.0f}",
+                f"frame p50 {datos['p50_ms']:.2f} ms  p99 {datos['p99_ms']:.2f} ms",
+                f"blits {datos['blits']}  entidades {datos['entidades']}",
+            ]
+        if self.extra is not None:
+            lineas.extend(self.extra())
+        renders = [self._fuente.render(linea, True, (255, 255, 255)) for linea in lineas]
+        alto_linea = self._fuente.get_linesize()
+        superficie = pygame.Surface((max(r.get_width() for r in renders) + 6,
+                                     alto_linea * len(renders) + 4), pygame.SRCALPHA)
+        superficie.fill((0, 0, 0, 160))
+        for i, render in enumerate(renders):
+            superficie.blit(render, (3, 2 + i * alto_linea))
+        self._superficie = superficie
+
+    def draw(self, renderer):
+        if not self.visible:
+            return None
+        ahora = time.perf_counter()
+        if self._superficie is None or ahora - self._ultimo >= self.refresco:
+            self._generar()
+            self._ultimo = ahora
+        return renderer.blit(self._superficie, self.posicion)
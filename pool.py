@@ -0,0 +1,48 @@
+class Pool:
+    """
+    Reserva de objetos reutilizables con capacidad fija.
+
+    Los objetos se crean de antemano con fabrica(); adquirir() devuelve uno
+    libre tras llamar a su método reset() y liberar() lo devuelve a la
+    reserva. Solo se crea un objeto nuevo (un fallo) si la reserva está vacía.
+    """
+    def __init__(self, fabrica, capacidad):
+        self.fabrica = fabrica
+        self.capacidad = capacidad
+        self.libres = [fabrica() for _ in range(capacidad)]
+        self.en_uso = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def adquirir(self):
+        if self.libres:
+            objeto = self.libres.pop()
+            self.aciertos += 1
+        else:
+            objeto = self.fabrica()
+            self.fallos += 1
+        objeto.reset()
+        self.en_uso += 1
+        return objeto
+
+    def ampliar(self, cantidad=1):
+        """
+        Crea cantidad objetos más y aumenta la capacidad en otros tantos.
+        """
+        self.capacidad += cantidad
+        self.libres.extend(self.fabrica() for _ in range(cantidad))
+
+    def liberar(self, objeto):
+        self.en_uso -= 1
+        # Si sobran (por fallos anteriores) se dejan para el recolector
+        if len(self.libres) < self.capacidad:
+            self.libres.append(objeto)
+
+    def estadisticas(self):
+        return {
+            'capacidad': self.capacidad,
+            'libres': len(self.libres),
+            'en_uso': self.en_uso,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+        }
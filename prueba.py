@@ -1,33 +1,50 @@
 import pygame
+import argparse
 import sys
 from pygame.locals import *
 import random
-import os
+import zlib
+from recursos import assets
+from tiempo import PasoFijo
+from colisiones import SpatialHash
+from pool import Pool
+from oleadas import Oleadas, ANTICIPACION, TABLA, cargar
+# Las reglas del juego están en simulacion.py, que las usa también sin ventana
+from simulacion import (ANCHO, ALTO, NEGRO, TICKS, TECHO, mover_jugador, colocar_enemigo,
+                        mover_enemigo, colocar_lobo, mover_lobo)
 
 # Definiciones de constantes
-ANCHO = 500
-ALTO = 400
-FPS = 30
-NEGRO = (0, 0, 0)
-
-def resource_path(relative_path):
-    """
-    Obtiene la ruta absoluta al recurso, funcionando tanto en desarrollo como en el ejecutable.
-    """
-    try:
-        # PyInstaller crea un atributo _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+FPS = 60
+NUM_ENEMIGOS = 3
+
+# Estados de la partida
+JUGANDO = 'jugando'
+CAYENDO = 'cayendo'
+REAPARECIENDO = 'reapareciendo'
+PAUSA = 'pausa'
+# Segundos que se muestra la caída y que el jugador es invulnerable al reaparecer
+DURACION_CAIDA = 3.0
+DURACION_REAPARICION = 1.0
+ICONO = (32, 32)
+# Segundos por frame que se pueden dedicar a preparar las próximas oleadas
+PRESUPUESTO_OLEADAS = 0.002
+# Lobos que persiguen a la oveja (--lobos) y hoyos que esquivan
+TAMANO_LOBO = (60, 60)
+TAMANO_HOYO = (70, 70)
+HOYOS = [(110, 220), (250, 310), (370, 180)]
+CELDA_FLUJO = 20
+# Un lobo no puede tener el centro a menos de esto de un hoyo
+MARGEN_HOYO = 20
 
 class Fondo:
     """
     Clase para manejar el fondo del juego.
     """
+    __slots__ = ('fondo', 'x', 'speed')
+
     def __init__(self, image_path, velocidad):
         try:
-            self.fondo = pygame.image.load(resource_path(image_path)).convert()
+            self.fondo = assets.imagen(image_path, alpha=False)
         except pygame.error as e:
             print(f"Error al cargar el fondo: {e}")
             pygame.quit()
@@ -43,16 +60,22 @@ class Player(pygame.sprite.Sprite):
     """
     Clase para el sprite del jugador.
     """
+    # pygame.sprite.Sprite tiene __dict__ (solo guarda ahí sus grupos); los
+    # atributos propios van en slots para que cada instancia ocupe menos
+    __slots__ = ('image', 'mask', 'rect', 'velocidad_x', 'velocidad_y')
+
     def __init__(self, image_path):
         super().__init__()
         # Cargar imagen del jugador
         try:
-            self.image = pygame.image.load(resource_path(image_path)).convert_alpha()
-            self.image.set_colorkey(NEGRO)  # Hace transparente el fondo negro de la imagen
+            # Colorkey NEGRO: hace transparente el fondo negro de la imagen
+            self.image = assets.imagen(image_path, colorkey=NEGRO)
         except pygame.error as e:
             print(f"Error al cargar la imagen del jugador: {e}")
             pygame.quit()
             sys.exit()
+        # Máscara para la colisión píxel a píxel (compartida, se calcula una vez)
+        self.mask = assets.mascara(self.image)
         
         # Obtener el rectángulo (sprite)
         self.rect = self.image.get_rect()
@@ -62,51 +85,24 @@ class Player(pygame.sprite.Sprite):
         self.velocidad_x = 0
         self.velocidad_y = 0
 
-    def update(self):
+    def update(self, teclas=None):
         """
         Actualiza la posición del jugador según las teclas pulsadas y limita su movimiento dentro de la pantalla.
+        Si no se pasa teclas se lee el teclado.
         """
-        # Reiniciar posición si sale por debajo de la pantalla
-        if self.rect.top > ALTO:
-            self.rect.bottom = 0
-        
-        # Velocidad predeterminada en cada bucle
-        self.velocidad_x = 0
-        self.velocidad_y = 0
-
         # Obtener el estado de las teclas
-        teclas = pygame.key.get_pressed()
+        if teclas is None:
+            teclas = pygame.key.get_pressed()
 
         # Mover el personaje según las teclas pulsadas
-        if teclas[pygame.K_a]:
-            self.velocidad_x = -5
-        if teclas[pygame.K_d]:
-            self.velocidad_x = 5
-        if teclas[pygame.K_w]:
-            self.velocidad_y = -5
-        if teclas[pygame.K_s]:
-            self.velocidad_y = 5
-
-        # Actualizar la posición del personaje
-        self.rect.x += self.velocidad_x
-        self.rect.y += self.velocidad_y
-
-        # Limitar el movimiento al área de la pantalla
-        if self.rect.left < 0:
-            self.rect.left = 0
-        if self.rect.right > ANCHO:
-            self.rect.right = ANCHO
-        if self.rect.bottom > ALTO:
-            self.rect.bottom = ALTO
-        if self.rect.top < 150:
-            self.rect.top = 150
+        self.velocidad_x, self.velocidad_y = mover_jugador(self.rect, teclas)
 
     def load_icon(self, image_path):
         """
         Cargar y establecer el icono del juego.
         """
         try:
-            icono = pygame.image.load(resource_path(image_path)).convert_alpha()
+            icono = assets.imagen(image_path, ICONO)
             pygame.display.set_icon(icono)
         except pygame.error as e:
             print(f"Error al cargar el icono del juego: {e}")
@@ -117,137 +113,522 @@ class Enemigo(pygame.sprite.Sprite):
     """
     Clase para los sprites de los enemigos.
     """
-    def __init__(self, image_path):
+    __slots__ = ('image', 'mask', 'rect', 'velocidad')
+    tipo = 'aguila'
+
+    def __init__(self, image_path, colocar=True):
         super().__init__()
         # Cargar imagen del enemigo
         try:
-            self.image = pygame.image.load(resource_path(image_path)).convert_alpha()
-            self.image.set_colorkey(NEGRO)  # Hace transparente el fondo negro de la imagen
+            # Imagen compartida por todas las águilas: no se vuelve a leer el archivo
+            self.image = assets.imagen(image_path, colorkey=NEGRO)
         except pygame.error as e:
             print(f"Error al cargar la imagen del enemigo: {e}")
             pygame.quit()
             sys.exit()
+        self.mask = assets.mascara(self.image)
         
         # Obtener el rectángulo (sprite)
         self.rect = self.image.get_rect()
-        # Ubicación aleatoria inicial
-        self.rect.x = random.randrange(ANCHO - self.rect.width)
-        self.rect.y = random.randrange(-100, -40)  # Comienza fuera de la pantalla
-        # Velocidad del enemigo
-        self.velocidad = random.randint(2, 5)
+        # Los que se crean de antemano para las oleadas se colocan al sacarlos
+        # del pool: crearlos no gasta números del azar de la partida
+        self.velocidad = 0
+        if colocar:
+            self.reset()
+
+    def reset(self):
+        """
+        Coloca el enemigo en una posición aleatoria fuera de la pantalla con una
+        velocidad nueva. Se usa al crearlo, al reaparecer y al sacarlo del pool.
+        """
+        # Ubicación y velocidad aleatorias; comienza por encima de la pantalla
+        self.velocidad = colocar_enemigo(self.rect, random)
 
     def update(self):
         """
         Movimiento básico del enemigo hacia abajo y reiniciar posición si sale de la pantalla.
         """
-        self.rect.x -= self.velocidad
-        self.rect.y += self.velocidad
         # Reiniciar posición si sale de la pantalla
-        if self.rect.top > ALTO or self.rect.right < 0:
-            self.rect.x = random.randrange(ANCHO - self.rect.width)
-            self.rect.y = random.randrange(-100, -40)
-            self.velocidad = random.randint(2, 5)
+        if mover_enemigo(self.rect, self.velocidad):
+            self.reset()
 
-def main():
+class Lobo(Enemigo):
     """
-    Función principal del juego.
+    Enemigo que corre por el suelo de derecha a izquierda.
     """
-    pygame.init()
-    PANTALLA = pygame.display.set_mode((ANCHO, ALTO))
-    pygame.display.set_caption("Ovejita")
-    clock = pygame.time.Clock()
-
-    # Crear grupos de sprites
-    sprites = pygame.sprite.Group()
-    enemigos = pygame.sprite.Group()
-
-    # Instanciar el jugador
-    jugador = Player('imagenes/oveja1.png')
-    sprites.add(jugador)
-
-    # Instanciar enemigos
-    for _ in range(3):  # Por ejemplo, 3 enemigos
-        aguila = Enemigo('imagenes/aguila.png')
-        enemigos.add(aguila)
-
-    # Cargar el icono del juego
-    jugador.load_icon('imagenes/oveja.png')
-
-    # Instanciar el fondo (opcional)
-    fondo = Fondo('imagenes/fondo.png', velocidad=5)
-
-    # Cargar la imagen de colisión una vez (fuera del bucle)
-    try:
-        caida = pygame.image.load(resource_path('imagenes/caido.png')).convert_alpha()
-    except pygame.error as e:
-        print(f"Error al cargar la imagen de colisión: {e}")
-        pygame.quit()
-        sys.exit()
+    __slots__ = ()
+    tipo = 'lobo'
+
+    def reset(self):
+        self.velocidad = colocar_lobo(self.rect, random)
+
+    def update(self):
+        if mover_lobo(self.rect, self.velocidad):
+            self.reset()
+
+# Tipos de enemigo que pueden aparecer en las oleadas: clase e imagen
+TIPOS = {
+    'aguila': (Enemigo, 'imagenes/aguila.png'),
+    'lobo': (Lobo, 'imagenes/lobo.png'),
+}
+
+class Juego:
+    """
+    Estado de una partida. El bucle principal está dividido en fases
+    (eventos, actualizar, colisiones, dibujar, presentar) para poder
+    ejecutarlas por separado, por ejemplo desde benchmark.py sin ventana.
+    """
+    def __init__(self, num_enemigos=NUM_ENEMIGOS, bandada=False, semilla=None, oleadas=None,
+                 lobos=0):
+        pygame.init()
+        self.pantalla = pygame.display.set_mode((ANCHO, ALTO))
+        pygame.display.set_caption("Ovejita")
+        self.clock = pygame.time.Clock()
+
+        # Con oleadas (oleadas.py) los enemigos salen según la tabla de ese
+        # archivo y num_enemigos no se usa
+        tabla = None
+        if oleadas is not None:
+            try:
+                tabla = cargar(oleadas, TIPOS)
+            except (OSError, ValueError) as e:
+                print(f"Error al cargar las oleadas: {e}")
+                pygame.quit()
+                sys.exit()
+        self.archivo_oleadas = oleadas
+
+        # Precargar las imágenes antes del primer frame, también las de los
+        # enemigos de las oleadas
+        imagenes = {'imagenes/aguila.png'}
+        if tabla is not None:
+            imagenes.update(TIPOS[oleada.tipo][1] for oleada in tabla)
+        try:
+            assets.precargar([
+                ('imagenes/oveja1.png', None, True, NEGRO),
+                *((imagen, None, True, NEGRO) for imagen in sorted(imagenes)),
+                'imagenes/caido.png',
+            ])
+        except pygame.error as e:
+            print(f"Error al precargar las imágenes: {e}")
+            pygame.quit()
+            sys.exit()
+
+        # Todo el azar de la partida sale de esta semilla: con la misma semilla
+        # y la misma entrada la partida se repite igual (ver repeticion.py)
+        if semilla is None:
+            semilla = random.randrange(2 ** 32)
+        self.semilla = semilla
+        random.seed(semilla)
+
+        # Crear grupos de sprites (se dibujan con dibujar_sprites)
+        self.sprites = pygame.sprite.Group()
+        self.enemigos = pygame.sprite.Group()
+
+        # Instanciar el jugador
+        self.jugador = Player('imagenes/oveja1.png')
+        self.sprites.add(self.jugador)
+
+        # El mundo mide lo mismo que la pantalla, así que no hace falta
+        # cámara (la tiene juego.py); lo que queda fuera de la pantalla, como
+        # las águilas que esperan por arriba, no se dibuja
+        self.vista = self.pantalla.get_rect()
+        # Zonas de la pantalla dibujadas en el frame anterior
+        self.zonas = []
+
+        # Índice espacial de los enemigos para las colisiones
+        self.indice = SpatialHash()
+
+        # Instanciar enemigos: como sprites o, para miles de águilas, como
+        # arrays de NumPy (entidades.Bandada; NumPy solo hace falta en ese caso)
+        self.num_enemigos = num_enemigos
+        self.bandada = None
+        self.pool = None
+        self.oleadas = None
+        if bandada:
+            from entidades import Bandada
+            imagen = assets.imagen('imagenes/aguila.png', colorkey=NEGRO)
+            self.bandada = Bandada(imagen, num_enemigos, ANCHO, ALTO,
+                                   mascara=assets.mascara(imagen), semilla=semilla)
+        elif tabla is not None:
+            # Un pool por tipo, vacío: se llena poco a poco antes de cada oleada
+            pools = {tipo: Pool(lambda clase=clase, imagen=imagen: clase(imagen, colocar=False), 0)
+                     for tipo, (clase, imagen) in TIPOS.items()}
+            self.oleadas = Oleadas(tabla, pools, random)
+            # Lo que sale nada más empezar se prepara ya, sin presupuesto
+            self.oleadas.preparar(hasta=ANTICIPACION)
+        else:
+            # Las águilas se reutilizan desde un pool en vez de crearlas de nuevo
+            self.pool = Pool(lambda: Enemigo('imagenes/aguila.png'), num_enemigos)
+            self.crear_enemigos()
+
+        # Lobos que persiguen a la oveja esquivando los hoyos. Todos siguen el
+        # mismo campo de flujo (flujo.py), que solo se recalcula cuando la
+        # oveja cambia de celda; como la bandada, necesitan NumPy
+        self.num_lobos = lobos
+        self.manada = None
+        self.campo = None
+        self.hoyos = []
+        if lobos:
+            from entidades import Manada
+            from flujo import CampoFlujo
+            try:
+                lobo = assets.imagen('imagenes/lobo.png', TAMANO_LOBO, colorkey=NEGRO)
+                hoyo = assets.imagen('imagenes/hoyo.png', TAMANO_HOYO, colorkey=NEGRO)
+            except pygame.error as e:
+                print(f"Error al cargar las imágenes de los lobos: {e}")
+                pygame.quit()
+                sys.exit()
+            self.campo = CampoFlujo(ANCHO, ALTO, CELDA_FLUJO)
+            # Los lobos van por el suelo, como la oveja
+            self.campo.bloquear(pygame.Rect(0, 0, ANCHO, TECHO))
+            for posicion in HOYOS:
+                rect = hoyo.get_rect(topleft=posicion)
+                self.hoyos.append(rect)
+                self.campo.bloquear(rect, MARGEN_HOYO)
+            self.manada = Manada(lobo, lobos, ANCHO, ALTO, mascara=assets.mascara(lobo),
+                                 semilla=semilla, suelo=(TECHO, ALTO - lobo.get_height()))
+
+        # Cargar el icono del juego
+        self.jugador.load_icon('imagenes/oveja.png')
+
+        # Instanciar el fondo (opcional)
+        self.fondo = Fondo('imagenes/fondo.png', velocidad=5)
+        if self.hoyos and hasattr(self.fondo, 'fondo'):
+            # Los hoyos no se mueven: se pintan una vez en una copia del fondo
+            fondo = self.fondo.fondo.copy()
+            for rect in self.hoyos:
+                fondo.blit(hoyo, rect)
+            self.fondo.fondo = fondo
+
+        # Cargar la imagen de colisión una vez (fuera del bucle)
+        try:
+            self.caida = assets.imagen('imagenes/caido.png')
+        except pygame.error as e:
+            print(f"Error al cargar la imagen de colisión: {e}")
+            pygame.quit()
+            sys.exit()
+
+        pygame.font.init()
+        self.texto_pausa = pygame.font.Font(None, 48).render("PAUSA", True, (255, 255, 255))
+
+        # Ya están creadas todas las variantes de las imágenes (también las
+        # de las oleadas): los archivos decodificados y el atlas sobran
+        assets.descartar_originales()
+
+        # Estado de la partida y segundos que le quedan (caída y reaparición)
+        self.estado = JUGANDO
+        self.tiempo_estado = 0.0
+        self.estado_previo = (JUGANDO, 0.0)
+
+        # El primer frame se dibuja completo; después solo las zonas que cambian
+        self.repintar = True
 
-    running = True
-    while running:
+        # La simulación avanza a TICKS pasos por segundo sean cuales sean los FPS
+        self.paso = PasoFijo(1.0 / TICKS)
+
+        # Veces que se ha pulsado la pausa en el frame en curso
+        self.pausas = 0
+
+        self.running = True
+
+    def crear_enemigos(self):
+        for _ in range(self.num_enemigos):
+            aguila = self.pool.adquirir()
+            self.enemigos.add(aguila)
+
+    def eventos(self):
+        self.pausas = 0
         for event in pygame.event.get():
             if event.type == QUIT:
-                running = False
-
-        # Actualizar sprites
-        sprites.update()
-        enemigos.update()
+                self.running = False
+            elif event.type == KEYDOWN and event.key == K_p:
+                self.alternar_pausa()
+                self.pausas += 1
+
+    def cambiar_estado(self, estado, duracion=0.0):
+        self.estado = estado
+        self.tiempo_estado = duracion
+        # Cada cambio de estado cambia lo que se ve: el siguiente frame va completo
+        self.repintar = True
+
+    def alternar_pausa(self):
+        if self.estado == PAUSA:
+            self.estado, self.tiempo_estado = self.estado_previo
+            self.repintar = True
+        else:
+            self.estado_previo = (self.estado, self.tiempo_estado)
+            self.cambiar_estado(PAUSA)
 
-        # Detección de colisión entre el jugador y los enemigos
-        colision = pygame.sprite.spritecollide(jugador, enemigos, True)
-        if colision:
-            print("¡Colisión detectada!")
+    def liberar_enemigo(self, enemigo):
+        if self.oleadas is not None:
+            self.oleadas.liberar(enemigo)
+        else:
+            self.pool.liberar(enemigo)
+
+    def reiniciar_enemigos(self):
+        if self.manada is not None:
+            self.manada.reiniciar()
+        if self.bandada is not None:
+            self.bandada.reiniciar()
+            return
+        for enemigo in self.enemigos:
+            self.liberar_enemigo(enemigo)
+        self.enemigos.empty()
+        self.indice.vaciar()
+        if self.oleadas is not None:
+            # Las oleadas vuelven a empezar desde el principio de la tabla
+            self.oleadas.reiniciar()
+        else:
+            self.crear_enemigos()
 
-            # Dibujar el fondo
-            if hasattr(fondo, 'fondo'):
-                PANTALLA.blit(fondo.fondo, (fondo.x, 0))
-            else:
-                PANTALLA.fill(NEGRO)
+    def actualizar(self, teclas=None):
+        """
+        Un paso de simulación según el estado de la partida: mueve el jugador y
+        los enemigos y hace avanzar la caída y la reaparición.
+        """
+        if self.estado == PAUSA:
+            return
+
+        if self.estado == CAYENDO:
+            # Mientras se muestra la caída la escena queda congelada
+            self.tiempo_estado -= self.paso.paso
+            if self.tiempo_estado <= 0:
+                self.reiniciar()
+            return
+
+        if self.estado == REAPARECIENDO:
+            self.tiempo_estado -= self.paso.paso
+            if self.tiempo_estado <= 0:
+                self.cambiar_estado(JUGANDO)
+
+        self.sprites.update(teclas)
+        if self.bandada is not None:
+            self.bandada.update()
+        else:
+            self.enemigos.update()
+        if self.oleadas is not None:
+            self.oleadas.update(self.paso.paso, self.enemigos)
+        if self.manada is not None:
+            self.campo.actualizar(*self.jugador.rect.center)
+            self.manada.update(self.campo)
+
+    def reiniciar(self):
+        """
+        Vuelve a empezar tras una caída: jugador al centro y enemigos nuevos.
+        """
+        # Resetear posición del jugador
+        self.jugador.rect.center = (ANCHO // 2, ALTO // 2)
 
-            # Dibujar los sprites antes de la imagen de caída
-            sprites.draw(PANTALLA)
-            enemigos.draw(PANTALLA)
+        # Reiniciar enemigos
+        self.reiniciar_enemigos()
 
-            # Dibujar la imagen de colisión centrada en el jugador
-            caida_rect = caida.get_rect(center=jugador.rect.center)
-            PANTALLA.blit(caida, caida_rect)
+        # Durante la reaparición los enemigos se mueven pero no hacen daño
+        self.cambiar_estado(REAPARECIENDO, DURACION_REAPARICION)
 
-            # Actualizar la pantalla para mostrar la imagen de colisión
-            pygame.display.flip()
+    def chocan(self):
+        """
+        Comprueba si algún enemigo toca al jugador y retira los que lo tocan.
+        """
+        lobos = False
+        if self.manada is not None:
+            # Los lobos que la alcanzan vuelven a aparecer por un lado
+            indices = self.manada.colisiones(self.jugador.rect, self.jugador.mask)
+            if indices.size:
+                self.manada.reaparecer(indices)
+                lobos = True
+
+        if self.bandada is not None:
+            return len(self.bandada.colisiones(self.jugador.rect, self.jugador.mask)) > 0 or lobos
+
+        # Solo se comprueban los enemigos de las celdas cercanas al jugador; a
+        # los que solapan su rect se les compara la máscara píxel a píxel
+        self.indice.actualizar(self.enemigos)
+        colision = self.indice.colisiones(self.jugador, pygame.sprite.collide_mask)
+        for enemigo in colision:
+            enemigo.kill()
+            self.indice.quitar(enemigo)
+            self.liberar_enemigo(enemigo)
+        return bool(colision) or lobos
+
+    def colisiones(self):
+        """
+        Detecta la colisión entre el jugador y los enemigos y, si la hay, pasa
+        al estado de caída. Devuelve True si hubo colisión.
+        """
+        if self.estado != JUGANDO or not self.chocan():
+            return False
 
-            # Pausar el juego para mostrar la imagen de caída
-            pygame.time.delay(3000)  # Pausa de 1 segundo
+        print("¡Colisión detectada!")
 
-            # Reiniciar el juego
-            # Resetear posición del jugador
-            jugador.rect.center = (ANCHO // 2, ALTO // 2)
+        # La caída se muestra durante DURACION_CAIDA sin bloquear el bucle
+        self.cambiar_estado(CAYENDO, DURACION_CAIDA)
+        return True
 
-            # Reiniciar enemigos
-            enemigos.empty()
-            for _ in range(3):
-                aguila = Enemigo('imagenes/aguila.png')
-                enemigos.add(aguila)
+    def simular(self, dt, teclas=None):
+        """
+        Ejecuta los pasos fijos que correspondan a dt segundos. Devuelve
+        cuántos se pidieron.
+        """
+        pasos = self.paso.consumir(dt)
+        self.simular_pasos(pasos, teclas)
+        return pasos
 
-            # Continuar con la siguiente iteración del bucle principal
-            continue
+    def simular_pasos(self, pasos, teclas=None):
+        for _ in range(pasos):
+            self.actualizar(teclas)
+            if self.colisiones():
+                break
 
-        # Dibujar el fondo
-        if hasattr(fondo, 'fondo'):
-            PANTALLA.blit(fondo.fondo, (fondo.x, 0))
+    def checksum(self):
+        """
+        CRC32 del estado de la simulación (jugador, enemigos y estado de la
+        partida). Sirve para comprobar que una repetición no se desvía.
+        """
+        crc = zlib.crc32(f"{self.estado} {self.tiempo_estado!r} {tuple(self.jugador.rect)}".encode())
+        if self.bandada is not None:
+            for array in (self.bandada.x, self.bandada.y, self.bandada.velocidad):
+                crc = zlib.crc32(array.tobytes(), crc)
         else:
-            PANTALLA.fill(NEGRO)
+            datos = [n for aguila in self.enemigos for n in (*aguila.rect, aguila.velocidad)]
+            crc = zlib.crc32(repr(datos).encode(), crc)
+        if self.manada is not None:
+            for array in (self.manada.x, self.manada.y, self.manada.velocidad):
+                crc = zlib.crc32(array.tobytes(), crc)
+        return crc
+
+    def informe_memoria(self):
+        import memoria
+        enemigos = {} if self.bandada is not None else {'enemigos': self.enemigos}
+        return memoria.informe({'jugador': [self.jugador], **enemigos})
+
+    def dibujar_fondo(self):
+        if hasattr(self.fondo, 'fondo'):
+            self.pantalla.blit(self.fondo.fondo, (self.fondo.x, 0))
+        else:
+            self.pantalla.fill(NEGRO)
 
-        # Dibujar todos los sprites
-        sprites.draw(PANTALLA)
-        enemigos.draw(PANTALLA)
+    def dibujar_sprites(self, sprites):
+        """
+        Dibuja los sprites que se ven en pantalla y devuelve sus zonas de la
+        pantalla.
+        """
+        vista = self.vista
+        return self.pantalla.blits([(sprite.image, sprite.rect)
+                                    for sprite in sprites if vista.colliderect(sprite.rect)])
+
+    def dibujar_enemigos(self):
+        if self.manada is not None:
+            self.manada.draw(self.pantalla)
+        if self.bandada is not None:
+            self.bandada.draw(self.pantalla)
+            return []
+        return self.dibujar_sprites(self.enemigos)
+
+    def dibujar(self):
+        """
+        Dibuja el frame y devuelve las zonas de la pantalla que han cambiado.
+        """
+        # Durante la caída y la pausa la escena no cambia después del primer frame
+        if self.estado in (CAYENDO, PAUSA) and not self.repintar:
+            return []
+
+        # Con la bandada o los lobos hay demasiadas zonas sueltas: se repinta todo
+        if self.bandada is not None or self.manada is not None:
+            self.repintar = True
+
+        if self.repintar:
+            # Dibujar el fondo completo solo cuando hace falta
+            self.dibujar_fondo()
+        elif hasattr(self.fondo, 'fondo'):
+            # Borrar los sprites del frame anterior pintando el fondo encima
+            for zona in self.zonas:
+                self.pantalla.blit(self.fondo.fondo, zona, zona)
+
+        # Dibujar los sprites; hay que actualizar donde estaban y donde están
+        anteriores = self.zonas
+        self.zonas = self.dibujar_sprites(self.sprites) + self.dibujar_enemigos()
+        zonas = anteriores + self.zonas
+
+        if self.estado == CAYENDO:
+            # Dibujar la imagen de colisión centrada en el jugador
+            caida_rect = self.caida.get_rect(center=self.jugador.rect.center)
+            self.pantalla.blit(self.caida, caida_rect)
+        elif self.estado == PAUSA:
+            self.pantalla.blit(self.texto_pausa,
+                               self.texto_pausa.get_rect(center=(ANCHO // 2, ALTO // 2)))
+        return zonas
+
+    def presentar(self, zonas):
+        # Actualizar la pantalla completa o solo las zonas que han cambiado
+        if self.repintar:
+            pygame.display.flip()
+            self.repintar = False
+        else:
+            pygame.display.update(zonas)
 
-        # Actualizar la pantalla completa
-        pygame.display.flip()
-        clock.tick(FPS)
+    def ejecutar(self, grabacion=None):
+        """
+        Bucle principal. Si se da una grabación (repeticion.Grabacion) se
+        guarda en ella la entrada y el checksum de cada frame.
+        """
+        while self.running:
+            dt = self.clock.tick(FPS) / 1000.0
+            self.eventos()
+            teclas = pygame.key.get_pressed()
+            pasos = self.simular(dt, teclas)
+            if grabacion is not None:
+                grabacion.frame(pasos, self.pausas, teclas, self.checksum())
+
+            # Si vamos atrasados se salta el dibujado, no la simulación
+            if not self.paso.debe_dibujar():
+                continue
+            self.presentar(self.dibujar())
+
+            # Con el frame ya en pantalla se crean los enemigos de las
+            # próximas oleadas, sin pasar del presupuesto
+            if self.oleadas is not None:
+                self.oleadas.preparar(PRESUPUESTO_OLEADAS)
+
+        if grabacion is not None:
+            grabacion.cerrar()
+        pygame.quit()
+        sys.exit()
 
-    pygame.quit()
-    sys.exit()
+def main():
+    """
+    Función principal del juego.
+    """
+    parser = argparse.ArgumentParser(description="Ovejita")
+    parser.add_argument('--enemigos', type=int, default=NUM_ENEMIGOS,
+                        help="número de águilas")
+    parser.add_argument('--bandada', action='store_true',
+                        help="guardar las águilas en arrays de NumPy (para miles de águilas)")
+    parser.add_argument('--semilla', type=int,
+                        help="semilla del azar, de 0 a 2**32 - 1 (por defecto, una al azar)")
+    parser.add_argument('--grabar', metavar='ARCHIVO',
+                        help="grabar la partida para reproducirla con repeticion.py")
+    parser.add_argument('--oleadas', metavar='TABLA', nargs='?', const=TABLA,
+                        help=f"sacar los enemigos por oleadas según esta tabla (por defecto, {TABLA})")
+    parser.add_argument('--lobos', type=int, default=0,
+                        help="lobos que persiguen a la oveja esquivando los hoyos")
+    args = parser.parse_args()
+    # La semilla y los números de enemigos van en la cabecera de las
+    # grabaciones como enteros de 32 bits sin signo
+    if args.semilla is not None and not 0 <= args.semilla < 2 ** 32:
+        parser.error("--semilla tiene que estar entre 0 y 2**32 - 1")
+    if args.enemigos < 0 or args.lobos < 0:
+        parser.error("--enemigos y --lobos no pueden ser negativos")
+    if args.oleadas and args.bandada:
+        parser.error("--oleadas no se puede usar con --bandada")
+    if args.grabar and args.oleadas not in (None, TABLA):
+        parser.error(f"solo se pueden grabar partidas con la tabla de oleadas {TABLA}")
+    juego = Juego(args.enemigos, bandada=args.bandada, semilla=args.semilla,
+                  oleadas=args.oleadas, lobos=args.lobos)
+    grabacion = None
+    if args.grabar:
+        from repeticion import Grabacion
+        grabacion = Grabacion(args.grabar, juego)
+    juego.ejecutar(grabacion)
 
 if __name__ == "__main__":
     main()
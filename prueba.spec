@@ -5,7 +5,7 @@ a = Analysis(
     ['prueba.py'],
     pathex=[],
     binaries=[],
-    datas=[('imagenes', 'imagenes')],
+    datas=[('imagenes', 'imagenes'), ('niveles', 'niveles')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
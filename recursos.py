@@ -0,0 +1,298 @@
+import pygame
+import json
+import mmap
+import struct
+import sys
+import os
+import zlib
+
+# Atlas generado por empaquetar.py
+ATLAS_PATH = 'imagenes/atlas.bin'
+ATLAS_MAGIC = b'OVEJATLS'
+ATLAS_VERSION = 3
+ATLAS_CABECERA = '<8sIIII'
+
+
+def resource_path(relative_path):
+    """
+    Obtiene la ruta absoluta al recurso, funcionando tanto en desarrollo como en el ejecutable.
+    """
+    try:
+        # PyInstaller crea un atributo _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+def suma_archivo(path):
+    """
+    Suma de comprobación (CRC-32) del contenido de un archivo. empaquetar.py
+    la guarda de cada PNG para saber si el atlas se ha quedado atrasado.
+    """
+    with open(path, 'rb') as archivo:
+        return zlib.crc32(archivo.read())
+
+
+def firma_archivo(path):
+    """
+    (tamaño, fecha de modificación en ns) de un archivo: lo que se compara
+    al arrancar para ver si un PNG ha cambiado, sin leerlo.
+    """
+    estado = os.stat(path)
+    return estado.st_size, estado.st_mtime_ns
+
+
+def convertir(superficie, alpha=True):
+    """
+    Convierte la superficie al formato de la pantalla para que se dibuje
+    rápido. Si no hay pantalla de pygame.display (con render.RendererGPU las
+    imágenes acaban en texturas) se devuelve tal cual.
+    """
+    if pygame.display.get_surface() is None:
+        return superficie
+    return superficie.convert_alpha() if alpha else superficie.convert()
+
+
+def bytes_superficie(superficie):
+    """
+    Bytes de píxeles propios de una superficie. Una subsuperficie comparte
+    los de su superficie madre y no ocupa nada aparte.
+    """
+    if superficie.get_parent() is not None:
+        return 0
+    return superficie.get_pitch() * superficie.get_height()
+
+
+class Atlas:
+    """
+    Hoja de píxeles RGBA generada por empaquetar.py.
+
+    El archivo se proyecta en memoria con mmap y la hoja se crea sobre ese
+    buffer sin copiarlo; cada imagen es una subsuperficie de la hoja.
+
+    Algunas imágenes se guardan ya reducidas, así que cada entrada del índice
+    lleva también el tamaño original y el tamaño en bytes, la fecha y la suma
+    del PNG del que salió: [x, y, ancho, alto, ancho original, alto original,
+    bytes, fecha, suma]. La suma la usa empaquetar.py; al arrancar solo se
+    miran el tamaño y la fecha, y solo en desarrollo (ver sirve()).
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, largo_indice, ancho, alto = struct.unpack_from(ATLAS_CABECERA, self._mapa)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            raise ValueError(f"{path} no es un atlas válido (versión {ATLAS_VERSION})")
+        inicio = struct.calcsize(ATLAS_CABECERA)
+        fin_indice = inicio + largo_indice
+        self.indice = json.loads(self._mapa[inicio:fin_indice].decode('utf-8'))
+        pixeles = memoryview(self._mapa)[fin_indice:fin_indice + ancho * alto * 4]
+        self.hoja = pygame.image.frombuffer(pixeles, (ancho, alto), 'RGBA')
+        self._al_dia = {}
+
+    def __contains__(self, path):
+        return path in self.indice
+
+    def sirve(self, path, size=None):
+        """
+        Si la imagen guardada se puede usar para dibujar path a size (None es
+        el tamaño original) sin ampliarla y sigue al día con el PNG.
+
+        En el ejecutable de PyInstaller el atlas se ha comprobado al
+        empaquetar (empaquetar.py no deja uno atrasado), así que no se toca el
+        PNG. En desarrollo se compara el tamaño y la fecha del PNG (os.stat,
+        sin leerlo) por si se ha editado sin volver a empaquetar.
+        """
+        entrada = self.indice.get(path)
+        if entrada is None:
+            return False
+        _, _, ancho, alto, ancho_original, alto_original, tamano, fecha, _ = entrada
+        if size is None:
+            size = (ancho_original, alto_original)
+        if ancho < size[0] or alto < size[1]:
+            return False
+        if hasattr(sys, '_MEIPASS'):
+            return True
+        al_dia = self._al_dia.get(path)
+        if al_dia is None:
+            try:
+                bytes_png, fecha_png = firma_archivo(resource_path(path))
+                al_dia = bytes_png == tamano and fecha_png <= fecha
+            except OSError:
+                al_dia = True
+            self._al_dia[path] = al_dia
+        return al_dia
+
+    def imagen(self, path):
+        return self.hoja.subsurface(pygame.Rect(self.indice[path][:4]))
+
+
+class AssetCache:
+    """
+    Caché central de imágenes.
+
+    Cada archivo se decodifica una sola vez; cada variante (ruta, tamaño,
+    alpha, colorkey) se convierte al formato de la pantalla y se escala una
+    sola vez, y todos los que la piden reciben la misma superficie. Las
+    superficies devueltas son compartidas: no hay que dibujar sobre ellas.
+
+    Si existe el atlas (ver empaquetar.py) las imágenes se recortan de él; si
+    no, o si la del atlas está reducida por debajo del tamaño pedido o ya no
+    coincide con el PNG, se lee el PNG.
+    """
+    def __init__(self, atlas_path=ATLAS_PATH):
+        self.atlas_path = atlas_path
+        self._atlas = None
+        self._sin_atlas = atlas_path is None
+        self._decodificadas = {}
+        # Rutas cuyo archivo decodificado salió del atlas
+        self._del_atlas = set()
+        self._superficies = {}
+        self._mascaras = {}
+        self._volteadas = {}
+
+    def _abrir_atlas(self):
+        if self._atlas is None and not self._sin_atlas:
+            try:
+                self._atlas = Atlas(resource_path(self.atlas_path))
+            except (OSError, ValueError, struct.error):
+                self._sin_atlas = True
+        return self._atlas
+
+    def _decodificar(self, path, size=None):
+        original = self._decodificadas.get(path)
+        if original is not None and path in self._del_atlas:
+            # Vale mientras el atlas la tenga al menos al tamaño pedido
+            if not self._abrir_atlas().sirve(path, size):
+                original = None
+        if original is None:
+            atlas = self._abrir_atlas()
+            if atlas is not None and atlas.sirve(path, size):
+                original = atlas.imagen(path)
+                self._del_atlas.add(path)
+            else:
+                original = pygame.image.load(resource_path(path))
+                self._del_atlas.discard(path)
+            self._decodificadas[path] = original
+        return original
+
+    def imagen(self, path, size=None, alpha=True, colorkey=None):
+        """
+        Devuelve la imagen lista para dibujar. Hay que crear antes la pantalla
+        (pygame.display.set_mode) para que se convierta a su formato. Lanza
+        pygame.error si el archivo no se puede cargar.
+        """
+        clave = (path, size, alpha, colorkey)
+        superficie = self._superficies.get(clave)
+        if superficie is None:
+            original = self._decodificar(path, size)
+            superficie = convertir(original, alpha)
+            if size is not None and superficie.get_size() != tuple(size):
+                if superficie.get_bitsize() in (24, 32):
+                    superficie = pygame.transform.smoothscale(superficie, size)
+                else:
+                    superficie = pygame.transform.scale(superficie, size)
+            if colorkey is not None:
+                # Con colorkey y alpha por píxel a la vez SDL usa un blit
+                # genérico muy lento (unas 30 veces más que sin colorkey);
+                # codificada en RLE salta de golpe los píxeles transparentes.
+                # Las subsuperficies del atlas (sin pantalla no se convierten)
+                # se dejan sin RLE
+                flags = pygame.RLEACCEL if superficie.get_parent() is None else 0
+                superficie.set_colorkey(colorkey, flags)
+            self._superficies[clave] = superficie
+        return superficie
+
+    def mascara(self, superficie):
+        """
+        Máscara de colisión de una superficie, calculada una sola vez. Pensada
+        para las superficies compartidas que devuelve imagen().
+        """
+        mascara = self._mascaras.get(superficie)
+        if mascara is None:
+            mascara = pygame.mask.from_surface(superficie)
+            self._mascaras[superficie] = mascara
+        return mascara
+
+    def volteada(self, superficie):
+        """
+        Versión volteada en horizontal de una superficie, calculada una sola
+        vez. Como mascara(), pensada para las superficies compartidas.
+        """
+        volteada = self._volteadas.get(superficie)
+        if volteada is None:
+            volteada = pygame.transform.flip(superficie, True, False)
+            self._volteadas[superficie] = volteada
+        return volteada
+
+    def decodificar(self, peticiones):
+        """
+        Lee de antemano los archivos sin convertirlos. No necesita la pantalla,
+        así que se puede llamar desde otro hilo mientras se muestra algo. Cada
+        petición es una ruta o una tupla (path, size) con el tamaño al que se
+        va a dibujar.
+        """
+        for peticion in peticiones:
+            if isinstance(peticion, str):
+                self._decodificar(peticion)
+            else:
+                self._decodificar(*peticion)
+
+    def precargar(self, peticiones):
+        """
+        Carga de antemano una lista de imágenes. Cada petición es una ruta o una
+        tupla con los argumentos de imagen(): (path, size, alpha, colorkey).
+        """
+        for peticion in peticiones:
+            if isinstance(peticion, str):
+                self.imagen(peticion)
+            else:
+                self.imagen(*peticion)
+
+    def descartar_originales(self):
+        """
+        Libera los archivos decodificados y el atlas una vez creadas todas las variantes.
+        """
+        self._decodificadas.clear()
+        self._del_atlas.clear()
+        self._atlas = None
+
+    def memoria(self):
+        """
+        Bytes que ocupa cada imagen sumando sus variantes, sus versiones
+        volteadas, sus máscaras y el archivo decodificado si aún se guarda.
+        La hoja del atlas cuenta aparte, como 'atlas'.
+        """
+        totales = {}
+        rutas = {}
+
+        def sumar(path, n):
+            totales[path] = totales.get(path, 0) + n
+
+        for (path, *_), superficie in self._superficies.items():
+            rutas[superficie] = path
+            sumar(path, bytes_superficie(superficie))
+        for path, original in self._decodificadas.items():
+            # Sin pantalla la variante puede ser el propio original
+            if original not in rutas:
+                sumar(path, bytes_superficie(original))
+        for superficie, volteada in self._volteadas.items():
+            rutas[volteada] = rutas.get(superficie, 'otras')
+            sumar(rutas[volteada], bytes_superficie(volteada))
+        for superficie, mascara in self._mascaras.items():
+            ancho, alto = mascara.get_size()
+            sumar(rutas.get(superficie, 'otras'), (ancho * alto + 7) // 8)
+        if self._atlas is not None:
+            hoja = self._atlas.hoja
+            sumar('atlas', hoja.get_pitch() * hoja.get_height())
+        return totales
+
+    def vaciar(self):
+        self.descartar_originales()
+        self._superficies.clear()
+        self._mascaras.clear()
+        self._volteadas.clear()
+
+
+# Caché compartida por todo el juego
+assets = AssetCache()
@@ -0,0 +1,471 @@
+"""
+Modo de dos jugadores en red (asyncio + UDP).
+
+El servidor es el que manda: simula la partida con las reglas de prueba.py
+(simulacion.mover_jugador para las dos ovejas, las águilas en arrays de
+entidades.Bandada y colisiones con máscaras) y envía a cada cliente el estado
+de cada paso. Los clientes solo mandan sus teclas y dibujan lo que reciben,
+interpolando entre los dos últimos estados con un pequeño retraso.
+
+Cada estado se envía como diferencia con el último que el cliente ha
+confirmado, avanzado los pasos que han pasado desde entonces con la regla de
+movimiento de las águilas (Estado.prediccion): solo van las entidades que
+no han seguido esa regla (los jugadores que se mueven y las águilas que
+reaparecen) y, si el cambio es pequeño, en 4 bytes en lugar de 7. La
+diferencia se calcula con NumPy de una vez para todas las entidades, así
+que el coste por paso crece poco con el número de águilas. Si el cliente
+no ha confirmado nada reciente se envía el estado completo.
+
+    python red.py servidor --enemigos 20
+    python red.py cliente          (dos veces, una por jugador)
+    python red.py prueba --enemigos 500 --segundos 5
+
+El modo prueba lanza el servidor y dos clientes automáticos sin ventana en
+localhost y comprueba que los clientes reconstruyen exactamente los estados
+del servidor.
+"""
+import argparse
+import asyncio
+import random
+import struct
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from entidades import Bandada
+from repeticion import codificar_teclas, TeclasGrabadas
+from simulacion import ANCHO, ALTO, NEGRO, TICKS, mover_jugador, cargar_mascaras
+
+PUERTO = 5555
+FPS = 60
+JUGADORES = 2
+# Tipos de mensaje
+UNIRSE = 1
+ENTRADA = 2
+ESTADO = 3
+# tipo, paso, paso base (SIN_BASE = estado completo), jugador, entidades, cortos, largos
+CABECERA = struct.Struct('<BIIBHHH')
+SIN_BASE = 0xFFFFFFFF
+GOLPES = struct.Struct(f'<{JUGADORES}H')
+# tipo, secuencia, teclas, último paso recibido
+MENSAJE_ENTRADA = struct.Struct('<BIBI')
+# Entidad que se ha movido poco desde el estado base / entidad completa
+CORTO = np.dtype([('id', '<u2'), ('dx', 'i1'), ('dy', 'i1')])
+LARGO = np.dtype([('id', '<u2'), ('x', '<i2'), ('y', '<i2'), ('v', 'u1')])
+# Estados que guarda el servidor para poder calcular diferencias (1 s)
+HISTORIA = TICKS
+# Pasos de retraso con los que dibuja el cliente, para tener dos estados
+# entre los que interpolar aunque alguno llegue tarde
+RETRASO = 2
+# Saltos mayores que esto (águilas que reaparecen) no se interpolan
+MAX_INTERPOLAR = 32
+# Máximo de entidades para que un estado completo quepa en un datagrama
+MAX_ENTIDADES = 8000
+
+
+class Estado:
+    """
+    Posición de todas las entidades en un paso: primero los jugadores y
+    después las águilas. v es la velocidad de cada águila.
+    """
+    __slots__ = ('x', 'y', 'v')
+
+    def __init__(self, x, y, v):
+        self.x = x
+        self.y = y
+        self.v = v
+
+    @classmethod
+    def vacio(cls, n):
+        return cls(np.zeros(n, np.int16), np.zeros(n, np.int16), np.zeros(n, np.uint8))
+
+    def prediccion(self, pasos):
+        """
+        Estado pasos más adelante si nada cambia de rumbo: las águilas siguen
+        su diagonal (mover_enemigo) y los jugadores, con v = 0, se quedan
+        quietos. Servidor y cliente calculan la diferencia contra esto y no
+        contra el estado base tal cual, así que las águilas que solo han
+        avanzado no se envían.
+        """
+        avance = self.v.astype(np.int32) * pasos
+        return Estado(self.x - avance, self.y + avance, self.v.copy())
+
+    def __eq__(self, otro):
+        return (np.array_equal(self.x, otro.x) and np.array_equal(self.y, otro.y)
+                and np.array_equal(self.v, otro.v))
+
+
+def codificar(tick, base_tick, jugador, estado, base, golpes):
+    """
+    Empaqueta estado como diferencia con base (None para enviarlo completo).
+    """
+    if base is None:
+        base_tick = SIN_BASE
+        base = Estado.vacio(len(estado.x))
+    else:
+        base = base.prediccion(tick - base_tick)
+    dx = estado.x.astype(np.int32) - base.x
+    dy = estado.y.astype(np.int32) - base.y
+    misma_v = estado.v == base.v
+    cambiados = (dx != 0) | (dy != 0) | ~misma_v
+    cortos = cambiados & misma_v & (np.abs(dx) < 128) & (np.abs(dy) < 128)
+    largos = cambiados & ~cortos
+
+    ids = np.flatnonzero(cortos)
+    registros_cortos = np.empty(len(ids), CORTO)
+    registros_cortos['id'] = ids
+    registros_cortos['dx'] = dx[ids]
+    registros_cortos['dy'] = dy[ids]
+
+    ids = np.flatnonzero(largos)
+    registros_largos = np.empty(len(ids), LARGO)
+    registros_largos['id'] = ids
+    registros_largos['x'] = estado.x[ids]
+    registros_largos['y'] = estado.y[ids]
+    registros_largos['v'] = estado.v[ids]
+
+    return b''.join((
+        CABECERA.pack(ESTADO, tick, base_tick, jugador, len(estado.x),
+                      len(registros_cortos), len(registros_largos)),
+        GOLPES.pack(*golpes),
+        registros_cortos.tobytes(),
+        registros_largos.tobytes(),
+    ))
+
+
+def decodificar(datos, estados):
+    """
+    Reconstruye un estado. estados es un diccionario paso -> Estado con los
+    ya recibidos. Devuelve (paso, jugador, Estado, golpes) o None si no se
+    tiene el estado base.
+    """
+    _, tick, base_tick, jugador, n, n_cortos, n_largos = CABECERA.unpack_from(datos)
+    if base_tick == SIN_BASE:
+        estado = Estado.vacio(n)
+    elif base_tick in estados:
+        estado = estados[base_tick].prediccion(tick - base_tick)
+    else:
+        return None
+    offset = CABECERA.size
+    golpes = GOLPES.unpack_from(datos, offset)
+    offset += GOLPES.size
+    cortos = np.frombuffer(datos, CORTO, n_cortos, offset)
+    offset += cortos.nbytes
+    largos = np.frombuffer(datos, LARGO, n_largos, offset)
+    estado.x[cortos['id']] += cortos['dx']
+    estado.y[cortos['id']] += cortos['dy']
+    estado.x[largos['id']] = largos['x']
+    estado.y[largos['id']] = largos['y']
+    estado.v[largos['id']] = largos['v']
+    return tick, jugador, Estado(estado.x.astype(np.int16), estado.y.astype(np.int16),
+                                 estado.v), golpes
+
+
+class Mundo:
+    """
+    Simulación de la partida en el servidor.
+    """
+    def __init__(self, enemigos, semilla=None):
+        if JUGADORES + enemigos > MAX_ENTIDADES:
+            raise ValueError(f"como mucho {MAX_ENTIDADES - JUGADORES} águilas")
+        self.mascara_jugador, mascara_aguila = cargar_mascaras()
+        imagen = pygame.Surface(mascara_aguila.get_size())
+        self.bandada = Bandada(imagen, enemigos, ANCHO, ALTO, mascara=mascara_aguila,
+                               semilla=semilla)
+        self.jugadores = []
+        for i in range(JUGADORES):
+            rect = pygame.Rect((0, 0), self.mascara_jugador.get_size())
+            rect.center = (ANCHO * (i + 1) // (JUGADORES + 1), ALTO // 2)
+            self.jugadores.append(rect)
+        self.teclas = [0] * JUGADORES
+        self.golpes = [0] * JUGADORES
+        self.tick = 0
+
+    def paso(self):
+        for rect, teclas in zip(self.jugadores, self.teclas):
+            mover_jugador(rect, TeclasGrabadas(teclas))
+        self.bandada.update()
+        # Las águilas que tocan a una oveja le cuentan un golpe y reaparecen
+        for i, rect in enumerate(self.jugadores):
+            choques = self.bandada.colisiones(rect, self.mascara_jugador)
+            if choques.size:
+                self.golpes[i] += 1
+                self.bandada.reaparecer(choques)
+        self.tick += 1
+
+    def estado(self):
+        return Estado(
+            np.concatenate(([r.x for r in self.jugadores], self.bandada.x)).astype(np.int16),
+            np.concatenate(([r.y for r in self.jugadores], self.bandada.y)).astype(np.int16),
+            np.concatenate(([0] * JUGADORES, self.bandada.velocidad)).astype(np.uint8),
+        )
+
+
+class Servidor(asyncio.DatagramProtocol):
+    def __init__(self, mundo, registrar=False):
+        self.mundo = mundo
+        self.transporte = None
+        # dirección -> [jugador, último paso confirmado, última secuencia]
+        self.clientes = {}
+        self.historia = {}
+        self.orden = deque()
+        # Con registrar se guardan todos los estados (para comprobarlos en prueba)
+        self.registro = {} if registrar else None
+        self.bytes_enviados = 0
+        self.envios = 0
+        self.tiempos = []
+
+    def connection_made(self, transporte):
+        self.transporte = transporte
+
+    def datagram_received(self, datos, direccion):
+        tipo = datos[0]
+        if tipo == UNIRSE and direccion not in self.clientes:
+            libres = set(range(JUGADORES)) - {c[0] for c in self.clientes.values()}
+            if libres:
+                self.clientes[direccion] = [min(libres), None, -1]
+        elif tipo == ENTRADA and direccion in self.clientes:
+            _, secuencia, teclas, ack = MENSAJE_ENTRADA.unpack(datos)
+            cliente = self.clientes[direccion]
+            # Los datagramas pueden llegar desordenados: solo cuenta el más nuevo
+            if secuencia > cliente[2]:
+                cliente[2] = secuencia
+                self.mundo.teclas[cliente[0]] = teclas
+                cliente[1] = ack
+
+    def paso(self):
+        inicio = time.perf_counter()
+        self.mundo.paso()
+        tick = self.mundo.tick
+        estado = self.mundo.estado()
+        self.historia[tick] = estado
+        self.orden.append(tick)
+        if len(self.orden) > HISTORIA:
+            del self.historia[self.orden.popleft()]
+        if self.registro is not None:
+            self.registro[tick] = estado
+        for direccion, (jugador, ack, _) in self.clientes.items():
+            base = self.historia.get(ack)
+            datos = codificar(tick, ack, jugador, estado, base, self.mundo.golpes)
+            self.transporte.sendto(datos, direccion)
+            self.bytes_enviados += len(datos)
+            self.envios += 1
+        self.tiempos.append(time.perf_counter() - inicio)
+
+    async def ejecutar(self, segundos=None):
+        reloj = asyncio.get_running_loop().time
+        inicio = reloj()
+        siguiente = inicio
+        while segundos is None or reloj() - inicio < segundos:
+            self.paso()
+            siguiente += 1.0 / TICKS
+            await asyncio.sleep(max(0.0, siguiente - reloj()))
+
+
+class Cliente(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.transporte = None
+        self.jugador = None
+        self.estados = {}
+        self.llegadas = {}
+        self.ultimo = None
+        self.golpes = (0,) * JUGADORES
+        self.secuencia = 0
+        self.bytes_recibidos = 0
+
+    def connection_made(self, transporte):
+        self.transporte = transporte
+        transporte.sendto(bytes([UNIRSE]))
+
+    def datagram_received(self, datos, direccion):
+        if datos[0] != ESTADO:
+            return
+        self.bytes_recibidos += len(datos)
+        resultado = decodificar(datos, self.estados)
+        if resultado is None:
+            return
+        tick, self.jugador, estado, golpes = resultado
+        if tick in self.estados:
+            return
+        self.estados[tick] = estado
+        self.llegadas[tick] = time.perf_counter()
+        if self.ultimo is None or tick > self.ultimo:
+            self.ultimo = tick
+            self.golpes = golpes
+        # Solo hacen falta los recientes (bases posibles e interpolación)
+        for viejo in [t for t in self.estados if t < self.ultimo - HISTORIA]:
+            del self.estados[viejo]
+            del self.llegadas[viejo]
+
+    def enviar_entrada(self, teclas):
+        if self.jugador is None and self.ultimo is None:
+            # Aún no ha contestado el servidor: se repite la petición
+            self.transporte.sendto(bytes([UNIRSE]))
+            return
+        self.secuencia += 1
+        ack = SIN_BASE if self.ultimo is None else self.ultimo
+        self.transporte.sendto(MENSAJE_ENTRADA.pack(ENTRADA, self.secuencia, teclas, ack))
+
+    def interpolado(self, ahora=None):
+        """
+        Estado a dibujar: RETRASO pasos por detrás del último recibido,
+        interpolado entre los dos estados que lo rodean.
+        """
+        if self.ultimo is None:
+            return None
+        if ahora is None:
+            ahora = time.perf_counter()
+        t = self.ultimo + (ahora - self.llegadas[self.ultimo]) * TICKS - RETRASO
+        a = int(t)
+        if a not in self.estados or a + 1 not in self.estados:
+            # Se ha perdido un estado o no llegan a tiempo: se dibuja el último
+            return self.estados[self.ultimo]
+        alpha = t - a
+        ea, eb = self.estados[a], self.estados[a + 1]
+        x = ea.x + (eb.x.astype(np.float32) - ea.x) * alpha
+        y = ea.y + (eb.y.astype(np.float32) - ea.y) * alpha
+        # Las águilas que reaparecen saltan: van directamente a la posición nueva
+        salto = (np.abs(eb.x.astype(np.int32) - ea.x) > MAX_INTERPOLAR) | \
+                (np.abs(eb.y.astype(np.int32) - ea.y) > MAX_INTERPOLAR)
+        x[salto] = eb.x[salto]
+        y[salto] = eb.y[salto]
+        return Estado(x.astype(np.int16), y.astype(np.int16), eb.v)
+
+
+async def cliente_ventana(host, puerto):
+    """
+    Cliente con ventana: manda WASD y dibuja las dos ovejas y las águilas.
+    """
+    pygame.display.init()
+    pantalla = pygame.display.set_mode((ANCHO, ALTO))
+    pygame.display.set_caption("Ovejita en red")
+    from recursos import assets
+    try:
+        fondo = assets.imagen('imagenes/fondo.png', alpha=False)
+        oveja = assets.imagen('imagenes/oveja1.png', colorkey=NEGRO)
+        aguila = assets.imagen('imagenes/aguila.png', colorkey=NEGRO)
+    except pygame.error as e:
+        print(f"Error al cargar las imágenes: {e}")
+        pygame.quit()
+        sys.exit()
+    # La otra oveja mira hacia el otro lado para distinguirlas
+    ovejas = [oveja, assets.volteada(oveja)]
+
+    loop = asyncio.get_running_loop()
+    transporte, cliente = await loop.create_datagram_endpoint(
+        Cliente, remote_addr=(host, puerto))
+    siguiente = loop.time()
+    ejecuta = True
+    while ejecuta:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                ejecuta = False
+        cliente.enviar_entrada(codificar_teclas(pygame.key.get_pressed()))
+
+        pantalla.blit(fondo, (0, 0))
+        estado = cliente.interpolado()
+        if estado is not None:
+            posiciones = list(zip(estado.x.tolist(), estado.y.tolist()))
+            pantalla.blits([(aguila, p) for p in posiciones[JUGADORES:]], doreturn=False)
+            for i, posicion in enumerate(posiciones[:JUGADORES]):
+                pantalla.blit(ovejas[i], posicion)
+            pygame.display.set_caption(
+                f"Ovejita en red - jugador {cliente.jugador + 1} - golpes "
+                + " / ".join(map(str, cliente.golpes)))
+        pygame.display.flip()
+        # El bucle de asyncio sigue atendiendo la red mientras espera al siguiente frame
+        siguiente += 1.0 / FPS
+        await asyncio.sleep(max(0.0, siguiente - loop.time()))
+    transporte.close()
+    pygame.quit()
+
+
+async def servidor(host, puerto, enemigos, segundos=None):
+    loop = asyncio.get_running_loop()
+    transporte, servidor = await loop.create_datagram_endpoint(
+        lambda: Servidor(Mundo(enemigos)), local_addr=(host, puerto))
+    print(f"Servidor en {host}:{puerto} con {enemigos} águilas")
+    try:
+        await servidor.ejecutar(segundos)
+    finally:
+        transporte.close()
+
+
+async def prueba(enemigos, segundos, puerto):
+    """
+    Servidor y dos clientes automáticos en localhost. Devuelve estadísticas.
+    """
+    loop = asyncio.get_running_loop()
+    transporte, servidor = await loop.create_datagram_endpoint(
+        lambda: Servidor(Mundo(enemigos, semilla=0), registrar=True),
+        local_addr=('127.0.0.1', puerto))
+    clientes = []
+    for _ in range(JUGADORES):
+        t, c = await loop.create_datagram_endpoint(Cliente, remote_addr=('127.0.0.1', puerto))
+        clientes.append((t, c))
+
+    async def jugar(cliente, rng):
+        teclas = 0
+        while True:
+            if rng.random() < 0.1:
+                teclas = rng.randrange(16)
+            cliente.enviar_entrada(teclas)
+            await asyncio.sleep(1.0 / FPS)
+
+    tareas = [asyncio.create_task(jugar(c, random.Random(i))) for i, (_, c) in enumerate(clientes)]
+    await servidor.ejecutar(segundos)
+    for tarea in tareas:
+        tarea.cancel()
+    await asyncio.sleep(0.05)
+    for t, _ in clientes:
+        t.close()
+    transporte.close()
+
+    completo = CABECERA.size + GOLPES.size + (JUGADORES + enemigos) * LARGO.itemsize
+    correctos = all(estado == servidor.registro[tick]
+                    for _, c in clientes for tick, estado in c.estados.items())
+    tiempos = sorted(servidor.tiempos)
+    return {
+        'enemigos': enemigos,
+        'pasos': servidor.mundo.tick,
+        'bytes_por_estado': servidor.bytes_enviados / max(1, servidor.envios),
+        'bytes_estado_completo': completo,
+        'kbit_s_por_cliente': servidor.bytes_enviados * 8 / 1000 / segundos / JUGADORES,
+        'paso_servidor_ms': 1000 * tiempos[len(tiempos) // 2],
+        'recibidos': [c.bytes_recibidos for _, c in clientes],
+        'correctos': correctos,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ovejita para dos jugadores en red")
+    parser.add_argument('modo', choices=('servidor', 'cliente', 'prueba'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=PUERTO)
+    parser.add_argument('--enemigos', type=int, default=20)
+    parser.add_argument('--segundos', type=float, default=5.0,
+                        help="duración del modo prueba")
+    args = parser.parse_args(argv)
+
+    if args.modo == 'servidor':
+        asyncio.run(servidor(args.host, args.puerto, args.enemigos))
+    elif args.modo == 'cliente':
+        asyncio.run(cliente_ventana(args.host, args.puerto))
+    else:
+        r = asyncio.run(prueba(args.enemigos, args.segundos, args.puerto))
+        print(f"{r['pasos']} pasos con {r['enemigos']} águilas: "
+              f"{r['bytes_por_estado']:.0f} bytes por estado "
+              f"(completo: {r['bytes_estado_completo']}), "
+              f"{r['kbit_s_por_cliente']:.1f} kbit/s por cliente, "
+              f"paso del servidor {r['paso_servidor_ms']:.3f} ms")
+        print("Estados de los clientes idénticos a los del servidor" if r['correctos']
+              else "Los clientes NO reconstruyen los estados del servidor")
+        return 0 if r['correctos'] else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
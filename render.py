@@ -0,0 +1,162 @@
+import os
+import weakref
+
+import pygame
+
+
+class DirtyRenderer:
+    """
+    Dibuja solo las zonas de la pantalla que cambian de un frame a otro.
+
+    Cada frame se borran los rectángulos dibujados en el frame anterior
+    restaurando el fondo, se dibujan los elementos en su nueva posición y se
+    envían a la pantalla únicamente los rectángulos viejos y nuevos. Cuando el
+    fondo se mueve hay que llamar a invalidar() para repintar todo.
+    """
+    def __init__(self, pantalla, restaurar_fondo):
+        self.pantalla = pantalla
+        # Función (pantalla, rect) que vuelve a pintar el fondo en esa zona
+        self.restaurar_fondo = restaurar_fondo
+        self.anteriores = []
+        self.actuales = []
+        self.completo = True
+        # Blits hechos en el frame en curso y en el último presentado
+        self.blits = 0
+        self.blits_frame = 0
+
+    def invalidar(self):
+        """
+        Fuerza un repintado de la pantalla completa en el próximo frame.
+        """
+        self.completo = True
+
+    def limpiar(self):
+        """
+        Borra los elementos del frame anterior pintando el fondo encima.
+        """
+        if self.completo:
+            return
+        for rect in self.anteriores:
+            self.restaurar_fondo(self.pantalla, rect)
+        self.blits += len(self.anteriores)
+
+    def blit(self, imagen, posicion):
+        rect = self.pantalla.blit(imagen, posicion)
+        self.actuales.append(rect)
+        self.blits += 1
+        return rect
+
+    def presentar(self):
+        """
+        Envía a la pantalla los cambios del frame y prepara el siguiente.
+        """
+        if self.completo:
+            pygame.display.update()
+        else:
+            pygame.display.update(self.anteriores + self.actuales)
+        self.anteriores = self.actuales
+        self.actuales = []
+        self.completo = False
+        self.blits_frame = self.blits
+        self.blits = 0
+
+
+class _Lienzo:
+    """
+    Lo que ven Fondo y la pantalla de carga en lugar de la superficie de la
+    pantalla cuando se dibuja con RendererGPU: blit y fill como los de
+    pygame.Surface, pero con texturas.
+    """
+    def __init__(self, renderer):
+        self._renderer = renderer
+
+    def get_size(self):
+        return self._renderer.tamano
+
+    def blit(self, imagen, posicion, area=None):
+        return self._renderer.dibujar(imagen, posicion, area)
+
+    def fill(self, color, rect=None):
+        gpu = self._renderer.renderer
+        gpu.draw_color = pygame.Color(color)
+        if rect is None:
+            gpu.clear()
+        else:
+            gpu.fill_rect(pygame.Rect(rect))
+
+
+class RendererGPU:
+    """
+    Alternativa a DirtyRenderer que dibuja con texturas de SDL2
+    (pygame._sdl2.video) en lugar de copiar píxeles con Surface.blit.
+
+    Cada superficie se sube a la tarjeta gráfica la primera vez que se dibuja
+    y después se reutiliza su textura; como las imágenes salen compartidas de
+    la caché de recursos, en la práctica se suben una vez al arrancar. SDL
+    agrupa las llamadas de dibujo de cada frame (SDL_RENDER_BATCHING). Cada
+    frame se dibuja entero, así que limpiar e invalidar no hacen nada. La
+    ventana se puede redimensionar: el juego se sigue dibujando a su tamaño
+    lógico y se escala con filtro 'lineal' o 'cercano'.
+    """
+    def __init__(self, titulo, tamano, escalado='lineal', vsync=False):
+        from pygame._sdl2 import video
+        # Las pistas de SDL se leen al crear el renderer y las texturas
+        os.environ['SDL_RENDER_SCALE_QUALITY'] = '1' if escalado == 'lineal' else '0'
+        os.environ['SDL_RENDER_BATCHING'] = '1'
+        self._Texture = video.Texture
+        self.tamano = tamano
+        self.ventana = video.Window(titulo, size=tamano, resizable=True)
+        self.renderer = video.Renderer(self.ventana, vsync=vsync)
+        self.renderer.logical_size = tamano
+        self.pantalla = _Lienzo(self)
+        # Texturas de cada superficie; desaparecen con ella
+        self.texturas = weakref.WeakKeyDictionary()
+        self.completo = True
+        self.blits = 0
+        self.blits_frame = 0
+
+    @classmethod
+    def crear(cls, titulo, tamano, escalado='lineal'):
+        """
+        Devuelve el renderer o None si esta instalación de pygame o el
+        sistema no lo permiten; entonces hay que usar DirtyRenderer.
+        """
+        try:
+            return cls(titulo, tamano, escalado)
+        except (ImportError, pygame.error) as e:
+            print(f"No se puede dibujar con texturas ({e}); se usa el renderer por software")
+            return None
+
+    def set_icon(self, icono):
+        self.ventana.set_icon(icono)
+
+    def textura(self, superficie):
+        textura = self.texturas.get(superficie)
+        if textura is None:
+            textura = self._Texture.from_surface(self.renderer, superficie)
+            self.texturas[superficie] = textura
+        return textura
+
+    def dibujar(self, imagen, posicion, area=None):
+        if area is None:
+            area = imagen.get_rect()
+        else:
+            area = pygame.Rect(area).clip(imagen.get_rect())
+        destino = pygame.Rect(posicion, area.size)
+        self.textura(imagen).draw(srcrect=area, dstrect=destino)
+        return destino
+
+    def invalidar(self):
+        pass
+
+    def limpiar(self):
+        pass
+
+    def blit(self, imagen, posicion):
+        self.blits += 1
+        return self.dibujar(imagen, posicion)
+
+    def presentar(self):
+        self.renderer.present()
+        self.blits_frame = self.blits
+        self.blits = 0
@@ -0,0 +1,183 @@
+"""
+Grabación y repetición de partidas de prueba.py.
+
+Una partida es determinista si se conocen la semilla del azar y la entrada de
+cada frame, así que basta con guardar eso para volver a jugarla igual. Cada
+frame ocupa 7 bytes (pasos de simulación, pulsaciones de pausa, teclas de
+movimiento y checksum del estado) y el archivo va comprimido con gzip.
+
+    python prueba.py --grabar partida.rep
+    python repeticion.py partida.rep
+    python repeticion.py partida.rep --dibujar
+
+La repetición va sin ventana y sin clock.tick, tan rápido como se pueda, y
+compara el checksum de cada frame con el grabado para detectar en qué frame
+se desvía la partida.
+"""
+import argparse
+import gzip
+import struct
+import sys
+import time
+
+import pygame
+
+MAGIA = b'OVEJAREP'
+VERSION = 2
+# magia, versión, semilla, enemigos, opciones, lobos
+CABECERA = struct.Struct('<8sHIIBI')
+# Las grabaciones de la versión 1 no tienen lobos
+CABECERA_V1 = struct.Struct('<8sHIIB')
+# pasos, pausas, teclas, checksum
+FRAME = struct.Struct('<BBBI')
+# Teclas de movimiento, un bit cada una
+TECLAS = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s)
+OPCION_BANDADA = 1
+# Enemigos por oleadas con la tabla por defecto (oleadas.TABLA)
+OPCION_OLEADAS = 2
+
+
+def codificar_teclas(teclas):
+    mascara = 0
+    for bit, tecla in enumerate(TECLAS):
+        if teclas[tecla]:
+            mascara |= 1 << bit
+    return mascara
+
+
+class TeclasGrabadas:
+    """
+    Estado de teclado reconstruido a partir de la máscara grabada; se usa
+    igual que pygame.key.get_pressed().
+    """
+    __slots__ = ('mascara',)
+
+    def __init__(self, mascara):
+        self.mascara = mascara
+
+    def __getitem__(self, tecla):
+        try:
+            return bool(self.mascara >> TECLAS.index(tecla) & 1)
+        except ValueError:
+            return False
+
+
+class Grabacion:
+    """
+    Va escribiendo los frames de una partida en un archivo.
+    """
+    def __init__(self, path, juego):
+        from oleadas import TABLA
+        # En la cabecera no cabe la tabla de oleadas: solo se graba con la de por defecto
+        if juego.archivo_oleadas not in (None, TABLA):
+            raise ValueError(f"solo se pueden grabar partidas con la tabla de oleadas {TABLA}")
+        self.archivo = gzip.open(path, 'wb')
+        opciones = OPCION_BANDADA if juego.bandada is not None else 0
+        if juego.oleadas is not None:
+            opciones |= OPCION_OLEADAS
+        self.archivo.write(CABECERA.pack(MAGIA, VERSION, juego.semilla,
+                                         juego.num_enemigos, opciones, juego.num_lobos))
+        self.frames = 0
+
+    def frame(self, pasos, pausas, teclas, checksum):
+        self.archivo.write(FRAME.pack(pasos, pausas, codificar_teclas(teclas), checksum))
+        self.frames += 1
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class Repeticion:
+    """
+    Partida grabada leída de un archivo.
+    """
+    def __init__(self, path):
+        datos = bytearray()
+        with gzip.open(path, 'rb') as archivo:
+            # Si el juego se cerró de golpe (un fallo que se quiere reproducir)
+            # el archivo queda cortado: se aprovechan los frames completos
+            try:
+                while bloque := archivo.read(4096):
+                    datos += bloque
+            except EOFError:
+                pass
+        magia, version = struct.unpack_from('<8sH', datos)
+        if magia != MAGIA or version not in (1, VERSION):
+            raise ValueError(f"{path} no es una repetición válida")
+        if version == 1:
+            cabecera = CABECERA_V1
+            _, _, self.semilla, self.enemigos, opciones = cabecera.unpack_from(datos)
+            self.lobos = 0
+        else:
+            cabecera = CABECERA
+            _, _, self.semilla, self.enemigos, opciones, self.lobos = cabecera.unpack_from(datos)
+        self.bandada = bool(opciones & OPCION_BANDADA)
+        self.oleadas = bool(opciones & OPCION_OLEADAS)
+        fin = cabecera.size + (len(datos) - cabecera.size) // FRAME.size * FRAME.size
+        self.frames = list(FRAME.iter_unpack(datos[cabecera.size:fin]))
+
+    def __len__(self):
+        return len(self.frames)
+
+    def crear_juego(self):
+        import prueba
+        return prueba.Juego(self.enemigos, bandada=self.bandada, semilla=self.semilla,
+                            oleadas=prueba.TABLA if self.oleadas else None, lobos=self.lobos)
+
+    def ejecutar_frame(self, juego, i):
+        """
+        Vuelve a jugar el frame i. Devuelve False si el estado no coincide con
+        el grabado.
+        """
+        pasos, pausas, teclas, checksum = self.frames[i]
+        for _ in range(pausas):
+            juego.alternar_pausa()
+        juego.simular_pasos(pasos, TeclasGrabadas(teclas))
+        return juego.checksum() == checksum
+
+    def reproducir(self, juego=None, dibujar=False):
+        """
+        Reproduce la partida entera. Devuelve el índice del primer frame que
+        se desvía o None si coincide toda.
+        """
+        if juego is None:
+            juego = self.crear_juego()
+        for i in range(len(self.frames)):
+            if not self.ejecutar_frame(juego, i):
+                return i
+            if dibujar:
+                juego.presentar(juego.dibujar())
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproducir una partida grabada de prueba.py")
+    parser.add_argument('archivo')
+    parser.add_argument('--dibujar', action='store_true',
+                        help="dibujar también cada frame (más lento)")
+    args = parser.parse_args(argv)
+
+    from benchmark import configurar_headless
+    configurar_headless()
+
+    import prueba
+    repeticion = Repeticion(args.archivo)
+    juego = repeticion.crear_juego()
+    inicio = time.perf_counter()
+    desvio = repeticion.reproducir(juego, dibujar=args.dibujar)
+    transcurrido = time.perf_counter() - inicio
+    pygame.quit()
+
+    n = len(repeticion)
+    print(f"{n} frames en {transcurrido:.3f} s "
+          f"({n / transcurrido if transcurrido else 0:.0f} FPS, "
+          f"x{n / prueba.FPS / transcurrido if transcurrido else 0:.0f} tiempo real)")
+    if desvio is not None:
+        print(f"La partida se desvía en el frame {desvio}")
+        return 1
+    print("Checksums correctos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
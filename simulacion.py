@@ -0,0 +1,322 @@
+"""
+Reglas de prueba.py sin ventana y simulación de partidas en lote.
+
+Las funciones de movimiento de este módulo son las que usan los sprites de
+prueba.py, así que una Partida de aquí sigue exactamente las mismas reglas
+pero sin pantalla, sin sprites y sin dibujar nada: solo rectángulos y
+máscaras. Eso permite jugar miles de partidas con un jugador automático para
+ajustar la dificultad:
+
+    python simulacion.py --partidas 2000 --vel-max 4 5 6 --velocidad 4 5 6 --csv balance.csv
+
+Cada combinación de parámetros se juega partidas veces, repartidas entre
+varios procesos (ProcessPoolExecutor); cada partida tiene su propia semilla,
+así que el resultado no depende de cuántos procesos se usen. El CSV tiene una
+fila por combinación con el tiempo de supervivencia medio, mediana, p10 y p90.
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+
+# Definiciones compartidas con prueba.py
+ANCHO = 500
+ALTO = 400
+NEGRO = (0, 0, 0)
+# Pasos de simulación por segundo
+TICKS = 30
+# El jugador no puede subir por encima de esta altura
+TECHO = 150
+VELOCIDAD_JUGADOR = 5
+# Rango de velocidades de las águilas (ambos incluidos)
+VELOCIDAD_ENEMIGO = (2, 5)
+# Rango de velocidades de los lobos, que corren por el suelo
+VELOCIDAD_LOBO = (3, 6)
+# Las imágenes se buscan junto a este archivo y no en el directorio actual:
+# el lote (y red.py) se pueden lanzar desde cualquier sitio
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+
+PARAMETROS = {
+    'vel_min': VELOCIDAD_ENEMIGO[0],
+    'vel_max': VELOCIDAD_ENEMIGO[1],
+    'velocidad': VELOCIDAD_JUGADOR,
+    'enemigos': 3,
+}
+
+
+def mover_jugador(rect, teclas, velocidad=VELOCIDAD_JUGADOR):
+    """
+    Mueve el rect del jugador según las teclas y lo limita a la pantalla.
+    Devuelve la velocidad (x, y) aplicada.
+    """
+    # Reiniciar posición si sale por debajo de la pantalla
+    if rect.top > ALTO:
+        rect.bottom = 0
+
+    velocidad_x = 0
+    velocidad_y = 0
+    if teclas[pygame.K_a]:
+        velocidad_x = -velocidad
+    if teclas[pygame.K_d]:
+        velocidad_x = velocidad
+    if teclas[pygame.K_w]:
+        velocidad_y = -velocidad
+    if teclas[pygame.K_s]:
+        velocidad_y = velocidad
+
+    rect.x += velocidad_x
+    rect.y += velocidad_y
+
+    # Limitar el movimiento al área de la pantalla
+    if rect.left < 0:
+        rect.left = 0
+    if rect.right > ANCHO:
+        rect.right = ANCHO
+    if rect.bottom > ALTO:
+        rect.bottom = ALTO
+    if rect.top < TECHO:
+        rect.top = TECHO
+    return velocidad_x, velocidad_y
+
+
+def colocar_enemigo(rect, rng, velocidades=VELOCIDAD_ENEMIGO):
+    """
+    Coloca un enemigo en una posición aleatoria por encima de la pantalla.
+    rng es el módulo random o un random.Random. Devuelve su velocidad nueva.
+    """
+    rect.x = rng.randrange(ANCHO - rect.width)
+    rect.y = rng.randrange(-100, -40)
+    return rng.randint(*velocidades)
+
+
+def mover_enemigo(rect, velocidad):
+    """
+    Mueve un enemigo en diagonal. Devuelve True si ha salido de la pantalla
+    y hay que volver a colocarlo.
+    """
+    rect.x -= velocidad
+    rect.y += velocidad
+    return rect.top > ALTO or rect.right < 0
+
+
+def colocar_lobo(rect, rng, velocidades=VELOCIDAD_LOBO):
+    """
+    Coloca un lobo a la derecha de la pantalla, a la altura por la que puede
+    moverse el jugador. Devuelve su velocidad nueva.
+    """
+    rect.x = ANCHO + rng.randrange(100)
+    rect.y = rng.randrange(TECHO, max(TECHO, ALTO - rect.height) + 1)
+    return rng.randint(*velocidades)
+
+
+def mover_lobo(rect, velocidad):
+    """
+    Mueve un lobo hacia la izquierda. Devuelve True si ha salido de la
+    pantalla y hay que volver a colocarlo.
+    """
+    rect.x -= velocidad
+    return rect.right < 0
+
+
+class Piloto:
+    """
+    Jugador automático: se aparta en horizontal del águila más cercana que
+    tiene encima y se queda abajo. De vez en cuando pulsa teclas al azar
+    para que las partidas no sean todas iguales.
+    """
+    def __init__(self, rng, azar=0.1):
+        self.rng = rng
+        self.azar = azar
+        self.teclas = dict.fromkeys((pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s), False)
+
+    def decidir(self, jugador, enemigos):
+        teclas = self.teclas
+        for tecla in teclas:
+            teclas[tecla] = False
+        if self.rng.random() < self.azar:
+            teclas[self.rng.choice(list(teclas))] = True
+            return teclas
+        teclas[pygame.K_s] = True
+        cercano = None
+        distancia = None
+        for rect, _ in enemigos:
+            if rect.bottom > jugador.bottom:
+                continue
+            d = abs(rect.centerx - jugador.centerx) + (jugador.top - rect.bottom)
+            if distancia is None or d < distancia:
+                cercano, distancia = rect, d
+        if cercano is not None:
+            if cercano.centerx > jugador.centerx:
+                teclas[pygame.K_a] = True
+            else:
+                teclas[pygame.K_d] = True
+        return teclas
+
+
+class Partida:
+    """
+    Una partida de prueba.py sin gráficos, hasta el primer choque.
+    """
+    def __init__(self, mascaras, semilla, parametros=PARAMETROS):
+        self.rng = random.Random(semilla)
+        self.mascara_jugador, self.mascara_enemigo = mascaras
+        self.velocidades = (parametros['vel_min'], parametros['vel_max'])
+        self.velocidad = parametros['velocidad']
+        self.jugador = pygame.Rect((0, 0), self.mascara_jugador.get_size())
+        self.jugador.center = (ANCHO // 2, ALTO // 2)
+        self.enemigos = []
+        for _ in range(parametros['enemigos']):
+            rect = pygame.Rect((0, 0), self.mascara_enemigo.get_size())
+            self.enemigos.append([rect, colocar_enemigo(rect, self.rng, self.velocidades)])
+        self.piloto = Piloto(self.rng)
+
+    def choca(self):
+        for rect, _ in self.enemigos:
+            if (self.jugador.colliderect(rect)
+                    and self.mascara_jugador.overlap(self.mascara_enemigo,
+                                                     (rect.x - self.jugador.x,
+                                                      rect.y - self.jugador.y))):
+                return True
+        return False
+
+    def jugar(self, max_pasos):
+        """
+        Devuelve los pasos que ha durado la partida (max_pasos si no choca).
+        """
+        for paso in range(max_pasos):
+            mover_jugador(self.jugador, self.piloto.decidir(self.jugador, self.enemigos),
+                          self.velocidad)
+            for enemigo in self.enemigos:
+                if mover_enemigo(enemigo[0], enemigo[1]):
+                    enemigo[1] = colocar_enemigo(enemigo[0], self.rng, self.velocidades)
+            if self.choca():
+                return paso + 1
+        return max_pasos
+
+
+def cargar_mascaras():
+    """
+    Máscaras del jugador y del águila. Solo lee los PNG: no hace falta
+    pantalla. Lanza pygame.error o FileNotFoundError si falta alguno.
+    """
+    mascaras = []
+    for path in ('imagenes/oveja1.png', 'imagenes/aguila.png'):
+        imagen = pygame.image.load(os.path.join(CARPETA, path))
+        imagen.set_colorkey(NEGRO)
+        mascaras.append(pygame.mask.from_surface(imagen))
+    return tuple(mascaras)
+
+
+# Máscaras de cada proceso del lote, cargadas una vez al arrancarlo
+_mascaras = None
+
+
+def _iniciar_proceso():
+    global _mascaras
+    _mascaras = cargar_mascaras()
+
+
+def _jugar(tarea):
+    combinacion, parametros, semilla, max_pasos = tarea
+    return combinacion, Partida(_mascaras, semilla, parametros).jugar(max_pasos)
+
+
+def lote(combinaciones, partidas, max_pasos, semilla=0, procesos=None):
+    """
+    Juega partidas partidas de cada combinación de parámetros repartidas
+    entre procesos. Devuelve, por combinación, la lista de pasos que duró
+    cada partida.
+    """
+    # Todas las combinaciones usan las mismas semillas: las diferencias entre
+    # ellas se deben a los parámetros y no a la suerte de cada lote
+    tareas = [(i, parametros, semilla + n, max_pasos)
+              for i, parametros in enumerate(combinaciones)
+              for n in range(partidas)]
+    procesos = procesos or os.cpu_count() or 1
+    # Si faltan las imágenes, mejor saberlo aquí que con los procesos caídos
+    # (BrokenProcessPool no dice por qué)
+    cargar_mascaras()
+    duraciones = [[] for _ in combinaciones]
+    # Tareas en bloques grandes: cada partida dura poco y así el coste de
+    # mandarlas a los procesos no se come la ganancia
+    bloque = max(1, len(tareas) // (procesos * 8))
+    with ProcessPoolExecutor(procesos, initializer=_iniciar_proceso) as ejecutor:
+        for combinacion, pasos in ejecutor.map(_jugar, tareas, chunksize=bloque):
+            duraciones[combinacion].append(pasos)
+    return duraciones
+
+
+def resumen(parametros, duraciones, max_pasos):
+    segundos = sorted(pasos / TICKS for pasos in duraciones)
+    n = len(segundos)
+    return {
+        **parametros,
+        'partidas': n,
+        'media_s': round(statistics.fmean(segundos), 3),
+        'mediana_s': round(statistics.median(segundos), 3),
+        'p10_s': round(segundos[int(n * 0.1)], 3),
+        'p90_s': round(segundos[min(n - 1, int(n * 0.9))], 3),
+        'completas': round(sum(pasos == max_pasos for pasos in duraciones) / n, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simular partidas de prueba.py en lote")
+    parser.add_argument('--partidas', type=int, default=500,
+                        help="partidas por combinación de parámetros")
+    parser.add_argument('--pasos', type=int, default=60 * TICKS,
+                        help="duración máxima de cada partida en pasos")
+    parser.add_argument('--vel-min', type=int, nargs='+', default=[PARAMETROS['vel_min']])
+    parser.add_argument('--vel-max', type=int, nargs='+', default=[PARAMETROS['vel_max']])
+    parser.add_argument('--velocidad', type=int, nargs='+', default=[PARAMETROS['velocidad']],
+                        help="velocidad del jugador")
+    parser.add_argument('--enemigos', type=int, nargs='+', default=[PARAMETROS['enemigos']])
+    parser.add_argument('--procesos', type=int,
+                        help="procesos a usar (por defecto, uno por núcleo)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--csv', default='balance.csv')
+    args = parser.parse_args(argv)
+    if args.partidas < 1 or args.pasos < 1:
+        parser.error("--partidas y --pasos tienen que ser mayores que 0")
+
+    combinaciones = [dict(zip(PARAMETROS, valores)) for valores in
+                     itertools.product(args.vel_min, args.vel_max, args.velocidad, args.enemigos)
+                     if valores[0] <= valores[1]]
+    # Las combinaciones con vel_min > vel_max se descartan; si no queda
+    # ninguna no hay nada que simular ni que escribir en el CSV
+    if not combinaciones:
+        parser.error("ninguna combinación de --vel-min y --vel-max cumple vel-min <= vel-max")
+    inicio = time.perf_counter()
+    try:
+        duraciones = lote(combinaciones, args.partidas, args.pasos, args.semilla, args.procesos)
+    except (OSError, pygame.error) as e:
+        print(f"Error al cargar las imágenes: {e}")
+        return 1
+    transcurrido = time.perf_counter() - inicio
+
+    filas = [resumen(parametros, d, args.pasos) for parametros, d in zip(combinaciones, duraciones)]
+    with open(args.csv, 'w', newline='') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=list(filas[0]))
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+    total = len(combinaciones) * args.partidas
+    print(f"{total} partidas en {transcurrido:.2f} s ({total / transcurrido:.0f} partidas/s, "
+          f"{args.procesos or os.cpu_count()} procesos) -> {args.csv}")
+    for fila in filas:
+        print(f"    vel {fila['vel_min']}-{fila['vel_max']}, jugador {fila['velocidad']}, "
+              f"{fila['enemigos']} águilas: media {fila['media_s']:.1f} s, "
+              f"mediana {fila['mediana_s']:.1f} s, completas {fila['completas']:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
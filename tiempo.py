@@ -0,0 +1,44 @@
+class PasoFijo:
+    """
+    Acumulador para simular a un ritmo fijo independiente de los FPS.
+
+    Cada frame se le pasa el tiempo real transcurrido y devuelve cuántos pasos
+    de simulación hay que ejecutar. Lo que sobra queda acumulado y alpha indica
+    en qué punto entre el último paso y el siguiente está el frame, para
+    interpolar al dibujar.
+    """
+    def __init__(self, paso, max_pasos=5, max_saltos=2):
+        self.paso = paso
+        # Como mucho se simulan max_pasos por frame; el tiempo que pase de ahí
+        # se descarta (p. ej. tras una pausa) para no encadenar frames lentos
+        self.max_pasos = max_pasos
+        # Frames seguidos que se pueden dejar sin dibujar cuando vamos atrasados
+        self.max_saltos = max_saltos
+        self.acumulado = 0.0
+        self.pasos = 0
+        self.saltos = 0
+
+    def consumir(self, dt):
+        """
+        Suma dt segundos y devuelve el número de pasos a simular en este frame.
+        """
+        self.acumulado += min(dt, self.paso * self.max_pasos)
+        self.pasos = min(int(self.acumulado / self.paso), self.max_pasos)
+        self.acumulado -= self.pasos * self.paso
+        return self.pasos
+
+    @property
+    def alpha(self):
+        return min(self.acumulado / self.paso, 1.0)
+
+    def debe_dibujar(self):
+        """
+        Indica si hay que dibujar este frame. Si la simulación ha necesitado el
+        máximo de pasos vamos atrasados y se salta el dibujado, pero nunca más
+        de max_saltos frames seguidos.
+        """
+        if self.pasos >= self.max_pasos and self.saltos < self.max_saltos:
+            self.saltos += 1
+            return False
+        self.saltos = 0
+        return True